@@ -1,25 +1,44 @@
 import streamlit as st
 import os
-import json
+import re
 import time
+import shutil
+import tempfile
 import threading
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from challenge_processor import PDFHeadingExtractor
-from challenge1b_processor import PersonaDrivenDocumentAnalyst
-# from schema_validator import SchemaValidator
-from utils import format_file_size, format_duration
+from schema_validator import SchemaValidator
+from utils import format_file_size, format_duration, dump_json
+
+# Page columns above which the relevance heat map bins pages into ranges
+HEATMAP_MAX_COLUMNS = 200
+
+# Uploads are copied to disk in chunks of this size to keep memory bounded
+UPLOAD_COPY_CHUNK = 1024 * 1024
 
 # Initialize session state
 if 'processing_results' not in st.session_state:
     st.session_state.processing_results = {}
 if 'processing_status' not in st.session_state:
     st.session_state.processing_status = {}
+if 'processing_stats' not in st.session_state:
+    # Running totals over processing_results so the sidebar does not rescan them
+    st.session_state.processing_stats = {'total': 0, 'success': 0, 'failed': 0, 'sum_time': 0.0}
+
+@st.cache_resource
+def get_processor():
+    """Create the heading extractor once and share it across reruns"""
+    from challenge_processor import PDFHeadingExtractor
+    
+    return PDFHeadingExtractor()
+
+@st.cache_resource
+def get_validator():
+    """Load and parse the challenge schema once and share it across reruns"""
+    return SchemaValidator('challenge_schema.json')
 
 def main():
     st.set_page_config(
@@ -48,7 +67,7 @@ def handle_challenge_1a():
     """Handle Challenge 1A: PDF Title & Heading Extraction"""
     
     try:
-        processor = PDFHeadingExtractor()
+        processor = get_processor()
     except Exception as e:
         st.error(f"Error initializing PDF processor: {str(e)}")
         return
@@ -76,19 +95,16 @@ def handle_challenge_1a():
         )
         
         st.subheader("Processing Stats")
-        if st.session_state.processing_results:
-            total_files = len(st.session_state.processing_results)
-            successful = sum(1 for r in st.session_state.processing_results.values() if r.get('status') == 'success')
-            failed = total_files - successful
-            
+        stats = st.session_state.processing_stats
+        if stats['total']:
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Total Files", total_files)
-                st.metric("Successful", successful)
+                st.metric("Total Files", stats['total'])
+                st.metric("Successful", stats['success'])
             with col2:
-                st.metric("Failed", failed)
-                if successful > 0:
-                    avg_time = sum(r.get('processing_time', 0) for r in st.session_state.processing_results.values() if r.get('status') == 'success') / successful
+                st.metric("Failed", stats['failed'])
+                if stats['success'] > 0:
+                    avg_time = stats['sum_time'] / stats['success']
                     st.metric("Avg Time", f"{avg_time:.2f}s")
     
     # Main content area
@@ -113,7 +129,7 @@ def handle_challenge_1a():
             valid_files = []
             
             for file in uploaded_files:
-                file_size = len(file.getvalue())
+                file_size = file.size
                 file_size_mb = file_size / (1024 * 1024)
                 
                 status = "✅ Valid"
@@ -181,10 +197,10 @@ def handle_challenge_1a():
                 with col3:
                     if status == 'success' and 'json_data' in result:
                         # Download button
-                        json_str = json.dumps(result['json_data'], indent=2)
+                        # Serialized once when the file was processed
                         st.download_button(
                             label="📥 Download JSON",
-                            data=json_str,
+                            data=result['json_bytes'],
                             file_name=f"{Path(filename).stem}.json",
                             mime="application/json"
                         )
@@ -204,53 +220,19 @@ def process_pdfs(files, processor, max_pages):
     status_text = st.empty()
     
     total_files = len(files)
+    validator = get_validator()
     
     for i, file in enumerate(files):
-        progress = (i + 1) / total_files
-        progress_bar.progress(progress)
         status_text.text(f"Processing {file.name}...")
         
-        try:
-            start_time = time.time()
-            
-            # Save uploaded file temporarily
-            temp_path = f"/tmp/{file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(file.getvalue())
-            
-            # Process PDF - extract title and headings
-            result = processor.extract_title_and_headings(temp_path)
-            
-            # Validate against challenge schema
-            from schema_validator import SchemaValidator
-            validator = SchemaValidator('challenge_schema.json')
-            is_valid, validation_errors = validator.validate(result)
-            
-            processing_time = time.time() - start_time
-            
-            # Update results
-            st.session_state.processing_results[file.name] = {
-                'status': 'success',
-                'processing_time': processing_time,
-                'json_data': result,
-                'schema_valid': is_valid,
-                'validation_errors': validation_errors,
-                'pages_processed': 1,
-                'headings_found': len(result.get('outline', []))
-            }
-            
-            # Clean up temp file
-            os.remove(temp_path)
-            
-            status_text.success(f"✅ {file.name} processed successfully!")
-            
-        except Exception as e:
-            st.session_state.processing_results[file.name] = {
-                'status': 'error',
-                'error': str(e),
-                'processing_time': time.time() - start_time if 'start_time' in locals() else 0
-            }
-            status_text.error(f"❌ Failed to process {file.name}: {str(e)}")
+        filename, file_result = _process_one(file, processor, validator, max_pages)
+        _record_result(filename, file_result)
+        
+        progress_bar.progress((i + 1) / total_files)
+        if file_result['status'] == 'success':
+            status_text.success(f"✅ {filename} processed successfully!")
+        else:
+            status_text.error(f"❌ Failed to process {filename}: {file_result['error']}")
     
     progress_bar.progress(1.0)
     status_text.success(f"🎉 Processing complete! {total_files} files processed.")
@@ -258,6 +240,77 @@ def process_pdfs(files, processor, max_pages):
     # Force UI update after processing
     st.rerun()
 
+def _record_result(filename, file_result):
+    """Store a file's result and keep the running sidebar stats in step"""
+    
+    results = st.session_state.processing_results
+    stats = st.session_state.processing_stats
+    
+    # Reprocessing a file replaces its earlier result, so undo that one first
+    previous = results.get(filename)
+    if previous is not None:
+        stats['total'] -= 1
+        if previous.get('status') == 'success':
+            stats['success'] -= 1
+            stats['sum_time'] -= previous.get('processing_time', 0)
+        else:
+            stats['failed'] -= 1
+    
+    results[filename] = file_result
+    stats['total'] += 1
+    if file_result.get('status') == 'success':
+        stats['success'] += 1
+        stats['sum_time'] += file_result.get('processing_time', 0)
+    else:
+        stats['failed'] += 1
+
+def _process_one(file, processor, validator, max_pages):
+    """Process a single uploaded PDF and return (filename, result)"""
+    
+    start_time = time.time()
+    temp_path = None
+    
+    try:
+        # Save uploaded file under a unique temporary name
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            temp_path = f.name
+            file.seek(0)
+            shutil.copyfileobj(file, f, UPLOAD_COPY_CHUNK)
+        
+        # Process PDF - extract title and headings
+        result = processor.extract_title_and_headings(temp_path, max_pages=max_pages)
+        
+        # Validate against challenge schema
+        is_valid, validation_errors = validator.validate(result)
+        
+        processing_time = time.time() - start_time
+        
+        return file.name, {
+            'status': 'success',
+            'processing_time': processing_time,
+            'json_data': result,
+            'json_bytes': dump_json(result),
+            'schema_valid': is_valid,
+            'validation_errors': validation_errors,
+            'pages_processed': 1,
+            'headings_found': len(result.get('outline', []))
+        }
+        
+    except Exception as e:
+        return file.name, {
+            'status': 'error',
+            'error': str(e),
+            'processing_time': time.time() - start_time
+        }
+    
+    finally:
+        # Clean up temp file, also when processing failed
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
 def handle_challenge_1b():
     """Handle Challenge 1B: Persona-Driven Document Intelligence"""
     
@@ -315,7 +368,7 @@ def handle_challenge_1b():
             
             # Show uploaded files
             for i, file in enumerate(uploaded_files):
-                st.text(f"{i+1}. {file.name} ({format_file_size(len(file.getvalue()))})")
+                st.text(f"{i+1}. {file.name} ({format_file_size(file.size)})")
     
     # Processing section
     if uploaded_files and persona_role and job_task:
@@ -323,6 +376,17 @@ def handle_challenge_1b():
         
         if st.button("🔍 Analyze Documents", type="primary", key="process_1b"):
             
+            # Save uploaded files under their original names in a directory of
+            # their own, so concurrent sessions cannot overwrite each other
+            temp_dir = tempfile.mkdtemp(prefix="challenge1b_")
+            temp_files = []
+            for file in uploaded_files:
+                temp_path = os.path.join(temp_dir, os.path.basename(file.name))
+                with open(temp_path, "wb") as f:
+                    file.seek(0)
+                    shutil.copyfileobj(file, f, UPLOAD_COPY_CHUNK)
+                temp_files.append(temp_path)
+            
             # Prepare input data
             input_data = {
                 "challenge_info": {
@@ -330,120 +394,137 @@ def handle_challenge_1b():
                     "test_case_name": "document_analysis",
                     "description": "Persona-driven document intelligence"
                 },
-                "documents": [{"filename": file.name, "title": file.name.replace('.pdf', '')} 
-                             for file in uploaded_files],
+                "documents": [{"filename": file.name, "title": file.name.replace('.pdf', ''), "path": temp_path} 
+                             for file, temp_path in zip(uploaded_files, temp_files)],
                 "persona": {"role": persona_role},
                 "job_to_be_done": {"task": job_task}
             }
             
-            # Save uploaded files temporarily
-            temp_files = []
-            for file in uploaded_files:
-                temp_path = f"/tmp/{file.name}"
-                with open(temp_path, "wb") as f:
-                    f.write(file.getvalue())
-                temp_files.append(temp_path)
-            
             try:
-                # Initialize analyzer
+                # Initialize analyzer (imported lazily, only Challenge 1B needs it)
+                from challenge1b_processor import PersonaDrivenDocumentAnalyst
                 analyzer = PersonaDrivenDocumentAnalyst()
                 
                 # Process documents
                 with st.spinner("🔍 Analyzing documents for persona-specific insights..."):
                     result = analyzer.analyze_documents(input_data)
                 
+                # Build the export payloads once and keep them with the result in
+                # this session, so tabs and reruns reuse the same bytes
+                exports = {
+                    'result': result,
+                    'json_bytes': dump_json(result),
+                    'summary_bytes': _build_summary(result).encode("utf-8")
+                }
+                st.session_state.challenge1b_exports = exports
+                
                 # Display results
                 st.success("✅ Analysis completed!")
                 
                 # Results display with heat map
-                display_challenge1b_results_with_heatmap(result, persona_role, job_task)
-                
-                # Clean up temp files
-                for temp_path in temp_files:
-                    try:
-                        os.remove(temp_path)
-                    except:
-                        pass
+                display_challenge1b_results_with_heatmap(exports, persona_role, job_task)
                         
             except Exception as e:
                 st.error(f"❌ Analysis failed: {str(e)}")
+            
+            finally:
+                # Clean up temp files, also when analysis failed
+                shutil.rmtree(temp_dir, ignore_errors=True)
     
     elif uploaded_files:
         st.info("👆 Please define the persona and job-to-be-done to start analysis")
     else:
         st.info("👆 Please upload PDF documents to begin")
 
-def display_challenge1b_results_with_heatmap(result, persona_role, job_task):
+def display_challenge1b_results_with_heatmap(exports, persona_role, job_task):
     """Display Challenge 1B analysis results with real-time relevance heat map"""
     
+    result = exports['result']
+    
     st.header("📊 Analysis Results")
     
+    # Build the columnar view of the sections once and share it with every tab
+    sections_df = pd.DataFrame(result.get("extracted_sections", []))
+    if not sections_df.empty:
+        if "relevance_score" not in sections_df:
+            sections_df["relevance_score"] = 0
+        sections_df["relevance_score"] = sections_df["relevance_score"].fillna(0)
+    
     # Create tabs for different views
     tab1, tab2, tab3 = st.tabs(["🔥 Relevance Heat Map", "📋 Analysis Results", "💾 Export Options"])
     
     with tab1:
         # Real-time Document Relevance Heat Map
-        create_relevance_heatmap(result, persona_role, job_task)
+        create_relevance_heatmap(sections_df, persona_role, job_task)
     
     with tab2:
         # Original results display
-        display_traditional_results(result)
+        display_traditional_results(exports, sections_df)
     
     with tab3:
         # Export options
-        display_export_options(result)
+        display_export_options(exports)
 
-def create_relevance_heatmap(result, persona_role, job_task):
+def create_relevance_heatmap(sections_df, persona_role, job_task):
     """Create interactive relevance heat map visualization"""
     
+    # plotly is only needed once results are shown, so keep it off the startup path
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.subheader("🔥 Real-time Document Relevance Heat Map")
     st.markdown("Visual representation of document sections ranked by relevance to your persona and job")
     
-    extracted_sections = result.get("extracted_sections", [])
-    
-    if not extracted_sections:
+    if sections_df.empty:
         st.warning("No sections available for heat map visualization")
         return
     
-    # Prepare data for heat map
-    heatmap_data = []
-    documents = list(set([section["document"] for section in extracted_sections]))
-    max_pages = max([section["page_number"] for section in extracted_sections])
-    
-    # Create matrix for heat map
-    heat_matrix = []
-    doc_labels = []
-    page_labels = []
-    hover_text = []
-    
-    for doc in documents:
-        doc_sections = [s for s in extracted_sections if s["document"] == doc]
-        doc_heat_row = []
-        doc_hover_row = []
-        
-        for page in range(1, max_pages + 1):
-            page_sections = [s for s in doc_sections if s["page_number"] == page]
-            
-            if page_sections:
-                # Calculate average relevance for this page
-                total_score = sum([s.get("relevance_score", 0) for s in page_sections])
-                avg_score = total_score / len(page_sections)
-                
-                # Get section titles for hover
-                section_titles = [s["section_title"] for s in page_sections]
-                hover_info = f"Document: {doc}<br>Page: {page}<br>Sections: {', '.join(section_titles)}<br>Relevance: {avg_score:.2f}"
-            else:
-                avg_score = 0
-                hover_info = f"Document: {doc}<br>Page: {page}<br>No relevant sections"
-            
-            doc_heat_row.append(avg_score)
-            doc_hover_row.append(hover_info)
-        
-        heat_matrix.append(doc_heat_row)
-        hover_text.append(doc_hover_row)
-        doc_labels.append(doc.replace('.pdf', ''))
-    
-    page_labels = [f"Page {i}" for i in range(1, max_pages + 1)]
+    # Prepare data for heat map: one groupby pass yields the document x page matrix
+    df = sections_df
+    
+    # Documents keep first-appearance (i.e. rank) order rather than groupby's sorted order
+    documents = df["document"].unique().tolist()
+    max_pages = int(df["page_number"].max())
+    
+    # Long documents are binned into page ranges so the matrix, and the hover text
+    # shipped to the browser, stays bounded at HEATMAP_MAX_COLUMNS columns
+    if max_pages > HEATMAP_MAX_COLUMNS:
+        step = -(-max_pages // HEATMAP_MAX_COLUMNS)
+        columns = range((max_pages - 1) // step + 1)
+        column_key = (df["page_number"] - 1) // step
+        ranges = [(c * step + 1, min((c + 1) * step, max_pages)) for c in columns]
+        page_labels = [f"Pages {first}-{last}" for first, last in ranges]
+        hover_pages = [f"Pages: {first}-{last}" for first, last in ranges]
+    else:
+        columns = range(1, max_pages + 1)
+        column_key = df["page_number"]
+        page_labels = [f"Page {i}" for i in columns]
+        hover_pages = [f"Page: {i}" for i in columns]
+    
+    grouped = df.groupby([df["document"], column_key], sort=False)
+    
+    # Average relevance per page, 0 where a document has no sections on a page
+    heat_pivot = (grouped["relevance_score"].mean()
+                  .unstack(fill_value=0)
+                  .reindex(index=documents, columns=columns, fill_value=0))
+    
+    # Section titles per page for hover, aligned with the heat matrix
+    title_pivot = (grouped["section_title"].agg(", ".join)
+                   .unstack()
+                   .reindex(index=heat_pivot.index, columns=columns))
+    
+    heat_matrix = heat_pivot.values
+    doc_labels = [doc.replace('.pdf', '') for doc in documents]
+    
+    hover_text = [
+        [
+            f"Document: {doc}<br>{page}<br>Sections: {titles}<br>Relevance: {score:.2f}"
+            if isinstance(titles, str) else
+            f"Document: {doc}<br>{page}<br>No relevant sections"
+            for page, titles, score in zip(hover_pages, title_row, heat_row)
+        ]
+        for doc, title_row, heat_row in zip(documents, title_pivot.values, heat_matrix)
+    ]
     
     # Create interactive heat map
     fig = go.Figure(data=go.Heatmap(
@@ -455,7 +536,7 @@ def create_relevance_heatmap(result, persona_role, job_task):
         colorscale='Reds',
         colorbar=dict(title="Relevance Score"),
         zmin=0,
-        zmax=max([max(row) for row in heat_matrix]) if heat_matrix else 1
+        zmax=heat_matrix.max() if heat_matrix.size else 1
     ))
     
     fig.update_layout(
@@ -471,19 +552,17 @@ def create_relevance_heatmap(result, persona_role, job_task):
     # Section importance bar chart
     st.subheader("📊 Section Importance Ranking")
     
-    if extracted_sections:
-        # Prepare data for bar chart
-        chart_data = []
-        for section in extracted_sections[:10]:  # Top 10 sections
-            chart_data.append({
-                "Section": section["section_title"][:30] + "..." if len(section["section_title"]) > 30 else section["section_title"],
-                "Relevance Score": section.get("relevance_score", 0),
-                "Document": section["document"].replace('.pdf', ''),
-                "Page": section["page_number"],
-                "Rank": section["importance_rank"]
-            })
-        
-        chart_df = pd.DataFrame(chart_data)
+    if not df.empty:
+        # Prepare data for bar chart from the top 10 sections as whole columns
+        top = df.head(10)
+        titles = top["section_title"]
+        chart_df = pd.DataFrame({
+            "Section": titles.str.slice(0, 30) + np.where(titles.str.len() > 30, "...", ""),
+            "Relevance Score": top["relevance_score"],
+            "Document": top["document"].str.replace('.pdf', '', regex=False),
+            "Page": top["page_number"],
+            "Rank": top["importance_rank"]
+        })
         
         # Create bar chart
         fig_bar = px.bar(
@@ -519,7 +598,7 @@ def create_relevance_heatmap(result, persona_role, job_task):
     
     with col2:
         # Keyword frequency in sections
-        keyword_freq = analyze_keyword_frequency(extracted_sections, persona_keywords + job_keywords)
+        keyword_freq = analyze_keyword_frequency(df, persona_keywords + job_keywords)
         
         if keyword_freq:
             freq_data = list(keyword_freq.items())
@@ -537,9 +616,11 @@ def create_relevance_heatmap(result, persona_role, job_task):
             fig_freq.update_layout(yaxis={'categoryorder':'total ascending'})
             st.plotly_chart(fig_freq, use_container_width=True)
 
-def display_traditional_results(result):
+def display_traditional_results(exports, sections_df):
     """Display traditional analysis results"""
     
+    result = exports['result']
+    
     # Metadata section
     metadata = result.get("metadata", {})
     
@@ -562,7 +643,6 @@ def display_traditional_results(result):
     if result.get("extracted_sections"):
         st.subheader("🎯 Most Relevant Sections")
         
-        sections_df = pd.DataFrame(result["extracted_sections"])
         st.dataframe(sections_df, use_container_width=True)
         
         # Show top sections in detail
@@ -589,68 +669,50 @@ def display_traditional_results(result):
             st.markdown("---")
     
     # Download section
+    render_export_buttons(exports, key_prefix="results")
+
+def display_export_options(exports):
+    """Display export options for analysis results"""
+    
+    render_export_buttons(exports, key_prefix="export")
+
+def render_export_buttons(exports, key_prefix):
+    """Render the JSON and summary download buttons for an analysis result and its export payloads"""
+    
+    metadata = exports['result'].get("metadata", {})
+    timestamp = metadata.get('processing_timestamp', 'unknown').replace(':', '-')
+    json_bytes, summary_bytes = exports['json_bytes'], exports['summary_bytes']
+    
     st.subheader("💾 Export Results")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # JSON download
-        json_str = json.dumps(result, indent=2)
         st.download_button(
             label="📥 Download Full Analysis (JSON)",
-            data=json_str,
-            file_name=f"challenge1b_analysis_{metadata.get('processing_timestamp', 'unknown').replace(':', '-')}.json",
-            mime="application/json"
+            data=json_bytes,
+            file_name=f"challenge1b_analysis_{timestamp}.json",
+            mime="application/json",
+            key=f"{key_prefix}_download_json"
         )
     
     with col2:
         # Summary download
-        summary = f"""
-PERSONA-DRIVEN DOCUMENT ANALYSIS SUMMARY
-
-Persona: {metadata.get('persona', 'Unknown')}
-Job to be Done: {metadata.get('job_to_be_done', 'Unknown')}
-Documents Analyzed: {len(metadata.get('input_documents', []))}
-Processing Time: {metadata.get('processing_timestamp', 'Unknown')}
-
-TOP RELEVANT SECTIONS:
-{chr(10).join([f"{i+1}. {s['section_title']} ({s['document']}, Page {s['page_number']})" 
-               for i, s in enumerate(result.get('extracted_sections', [])[:5])])}
-
-DETAILED CONTENT ANALYSIS:
-{chr(10).join([f"- {a['document']} (Page {a['page_number']}): {a['refined_text'][:100]}..." 
-               for a in result.get('subsection_analysis', [])[:3]])}
-        """
-        
         st.download_button(
             label="📄 Download Summary (TXT)",
-            data=summary.strip(),
-            file_name=f"challenge1b_summary_{metadata.get('processing_timestamp', 'unknown').replace(':', '-')}.txt",
-            mime="text/plain"
+            data=summary_bytes,
+            file_name=f"challenge1b_summary_{timestamp}.txt",
+            mime="text/plain",
+            key=f"{key_prefix}_download_summary"
         )
 
-def display_export_options(result):
-    """Display export options for analysis results"""
+def _build_summary(result):
+    """Build the plain-text summary of an analysis result"""
     
     metadata = result.get("metadata", {})
     
-    st.subheader("💾 Export Results")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # JSON download
-        json_str = json.dumps(result, indent=2)
-        st.download_button(
-            label="📥 Download Full Analysis (JSON)",
-            data=json_str,
-            file_name=f"challenge1b_analysis_{metadata.get('processing_timestamp', 'unknown').replace(':', '-')}.json",
-            mime="application/json"
-        )
-    
-    with col2:
-        # Summary download
-        summary = f"""
+    summary = f"""
 PERSONA-DRIVEN DOCUMENT ANALYSIS SUMMARY
 
 Persona: {metadata.get('persona', 'Unknown')}
@@ -665,63 +727,79 @@ TOP RELEVANT SECTIONS:
 DETAILED CONTENT ANALYSIS:
 {chr(10).join([f"- {a['document']} (Page {a['page_number']}): {a['refined_text'][:100]}..." 
                for a in result.get('subsection_analysis', [])[:3]])}
-        """
-        
-        st.download_button(
-            label="📄 Download Summary (TXT)",
-            data=summary.strip(),
-            file_name=f"challenge1b_summary_{metadata.get('processing_timestamp', 'unknown').replace(':', '-')}.txt",
-            mime="text/plain"
-        )
+    """
+    
+    return summary.strip()
+
+# Relevant keywords per persona, in display order
+PERSONA_KEYWORDS = {
+    "food contractor": ("ingredients", "recipe", "menu", "dietary", "nutrition", "cooking", "preparation", "serving"),
+    "travel planner": ("destination", "itinerary", "activities", "accommodation", "transport", "budget", "attractions"),
+    "academic researcher": ("methodology", "analysis", "research", "study", "data", "results", "conclusions"),
+    "business analyst": ("strategy", "analysis", "metrics", "performance", "trends", "market", "revenue"),
+    "student": ("concepts", "definition", "examples", "theory", "practice", "learning", "education"),
+    "investment analyst": ("financial", "investment", "portfolio", "risk", "returns", "market", "valuation"),
+    "journalist": ("facts", "sources", "investigation", "reporting", "news", "interviews", "story")
+}
+DEFAULT_PERSONA_KEYWORDS = ("relevant", "important", "key", "essential", "critical")
+
+# Common important words in job descriptions
+JOB_TERMS = frozenset({
+    "plan", "prepare", "create", "develop", "analyze", "research", "investigate", 
+    "design", "implement", "manage", "organize", "coordinate", "review", "evaluate",
+    "vegetarian", "gluten-free", "buffet", "menu", "corporate", "gathering",
+    "trip", "travel", "budget", "group", "college", "friends", "days", "itinerary"
+})
+
+# Words of more than 3 characters; hyphenated terms such as "gluten-free" stay whole
+_JOB_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z\-]{3,}")
 
 def get_persona_keywords(persona_role):
     """Get relevant keywords for a persona"""
     
-    persona_keywords = {
-        "food contractor": ["ingredients", "recipe", "menu", "dietary", "nutrition", "cooking", "preparation", "serving"],
-        "travel planner": ["destination", "itinerary", "activities", "accommodation", "transport", "budget", "attractions"],
-        "academic researcher": ["methodology", "analysis", "research", "study", "data", "results", "conclusions"],
-        "business analyst": ["strategy", "analysis", "metrics", "performance", "trends", "market", "revenue"],
-        "student": ["concepts", "definition", "examples", "theory", "practice", "learning", "education"],
-        "investment analyst": ["financial", "investment", "portfolio", "risk", "returns", "market", "valuation"],
-        "journalist": ["facts", "sources", "investigation", "reporting", "news", "interviews", "story"]
-    }
-    
-    return persona_keywords.get(persona_role.lower(), ["relevant", "important", "key", "essential", "critical"])
+    return list(PERSONA_KEYWORDS.get(persona_role.lower(), DEFAULT_PERSONA_KEYWORDS))
 
 def extract_job_keywords(job_task):
     """Extract important keywords from job description"""
     
     # Simple keyword extraction based on common terms
-    important_words = []
-    words = job_task.lower().split()
-    
-    # Common important words in job descriptions
-    job_related_terms = {
-        "plan", "prepare", "create", "develop", "analyze", "research", "investigate", 
-        "design", "implement", "manage", "organize", "coordinate", "review", "evaluate",
-        "vegetarian", "gluten-free", "buffet", "menu", "corporate", "gathering",
-        "trip", "travel", "budget", "group", "college", "friends", "days", "itinerary"
-    }
-    
-    for word in words:
-        clean_word = word.strip('.,!?;:').lower()
-        if clean_word in job_related_terms and len(clean_word) > 3:
-            important_words.append(clean_word)
-    
-    return list(set(important_words))
+    words = {match.group(0).lower() for match in _JOB_TOKEN_RE.finditer(job_task)}
+    return list(words & JOB_TERMS)
 
-def analyze_keyword_frequency(sections, keywords):
-    """Analyze frequency of keywords in extracted sections"""
+def analyze_keyword_frequency(sections_df, keywords):
+    """Analyze frequency of keywords in extracted sections (a DataFrame of sections)"""
     
     keyword_freq = {keyword: 0 for keyword in keywords}
+    if not keyword_freq:
+        return {}
+    
+    # A keyword listed more than once (persona and job keywords can overlap)
+    # counts once per copy for every section it appears in
+    copies = Counter(keywords)
+    
+    # Map each lowercase keyword to every keyword it should count for, including
+    # shorter keywords it contains, since one match position reports only the longest
+    lowered = {}
+    for keyword in keyword_freq:
+        lowered.setdefault(keyword.lower(), []).append(keyword)
+    credits = {
+        lower: [k for other, originals in lowered.items() if other in lower for k in originals]
+        for lower in lowered
+    }
     
-    for section in sections:
-        section_text = (section.get("section_title", "") + " " + section.get("content", "")).lower()
-        
-        for keyword in keywords:
-            if keyword.lower() in section_text:
-                keyword_freq[keyword] += 1
+    # One scan per section: a lookahead alternation tries every start position once
+    alternation = "|".join(re.escape(k) for k in sorted(lowered, key=len, reverse=True))
+    pattern = re.compile(f"(?=({alternation}))")
+    
+    # Lowercased "title content" text of every section, built column-wise
+    titles = sections_df.get("section_title", pd.Series("", index=sections_df.index)).fillna("")
+    contents = sections_df.get("content", pd.Series("", index=sections_df.index)).fillna("")
+    section_texts = titles.str.cat(contents, sep=" ").str.lower()
+    
+    for section_text in section_texts:
+        matched = {k for lower in set(pattern.findall(section_text)) for k in credits[lower]}
+        for keyword in matched:
+            keyword_freq[keyword] += copies[keyword]
     
     # Return only keywords that appear at least once
     return {k: v for k, v in keyword_freq.items() if v > 0}
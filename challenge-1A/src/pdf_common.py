@@ -0,0 +1,70 @@
+"""
+Shared PDF parsing helpers and constants for the Challenge 1a processors
+"""
+
+import os
+import multiprocessing
+import fitz  # PyMuPDF
+from typing import List
+
+# Only text spans are used, so skip image blocks and keep ligatures decomposed
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES
+
+# Parsed text dict for pages without any text operators
+EMPTY_TEXT_DICT = {"blocks": []}
+
+# Image colorspaces whose name matches what a decoded Pixmap reports, so image
+# metadata can be read from the image dictionary without decompressing pixels
+DEVICE_COLORSPACES = frozenset({"DeviceRGB", "DeviceGray", "DeviceCMYK"})
+
+# Line prefixes that mark a text block as a list
+BULLET_PREFIXES = ("•", "-", "*", "1.", "2.", "3.")
+
+# Worker processes are recycled after this many PDFs so MuPDF's global state and
+# font caches can't grow without bound over a large batch
+MAX_TASKS_PER_CHILD = 25
+
+def page_has_text(page: fitz.Page) -> bool:
+    """
+    Cheap check for whether a page can contain any text
+    
+    Text is only drawn between BT/ET operators, so a page whose content stream
+    has no BT (and no form XObjects, annotations or form fields, whose
+    appearance streams can hold text) can skip text parsing.
+    """
+    if page.get_xobjects() or page.first_annot or page.first_widget:
+        return True
+    return b"BT" in page.read_contents()
+
+def find_pdf_files(input_dir) -> List[str]:
+    """
+    List the PDF files directly inside a directory
+    
+    Args:
+        input_dir: Directory to scan
+    
+    Returns:
+        Plain string paths, which are cheap to hand to worker processes
+    """
+    # scandir entries carry their type, so no Path objects or extra stat calls are needed
+    with os.scandir(input_dir) as entries:
+        return [entry.path for entry in entries
+                if entry.name.endswith(".pdf") and entry.is_file()]
+
+def spawn_pool(processes: int, maxtasksperchild=MAX_TASKS_PER_CHILD):
+    """
+    Create a process pool for PDF work
+    
+    MuPDF is not thread-safe, so PDFs are processed in separate processes.
+    Spawned (not forked) workers start from a clean interpreter with no
+    inherited MuPDF state.
+    
+    Args:
+        processes: Number of worker processes
+        maxtasksperchild: Tasks before a worker is replaced (None to keep workers)
+    
+    Returns:
+        multiprocessing Pool
+    """
+    ctx = multiprocessing.get_context("spawn")
+    return ctx.Pool(processes=processes, maxtasksperchild=maxtasksperchild)
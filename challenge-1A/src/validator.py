@@ -1,193 +1,490 @@
+import os
+import sys
+import copy
 import json
+import hashlib
+import logging
+import multiprocessing
 import jsonschema
 from typing import Dict, Any, Tuple
 from pathlib import Path
 
-class SchemaValidator:
-    """
-    Validates JSON output against the required schema for Adobe Hackathon Challenge 1a
-    """
-    
-    def __init__(self, schema_path: str = "output_schema.json"):
-        self.schema_path = schema_path
-        self._schema = None
-        self._load_schema()
-    
-    def _load_schema(self):
-        """Load the JSON schema from file"""
-        try:
-            with open(self.schema_path, 'r') as f:
-                self._schema = json.load(f)
-        except FileNotFoundError:
-            # If schema file doesn't exist, create a default one
-            self._create_default_schema()
-        except json.JSONDecodeError as e:
-            raise Exception(f"Invalid JSON in schema file: {str(e)}")
-    
-    def _create_default_schema(self):
-        """Create a default schema if none exists"""
-        self._schema = {
-            "$schema": "http://json-schema.org/draft-07/schema#",
-            "title": "PDF Processing Output Schema",
-            "description": "Schema for structured data extracted from PDF documents",
+from utils import dump_json, load_json
+
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is optional; jsonschema handles everything without it
+    fastjsonschema = None
+
+logger = logging.getLogger(__name__)
+
+# Schema used when the schema file does not exist
+DEFAULT_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "PDF Processing Output Schema",
+    "description": "Schema for structured data extracted from PDF documents",
+    "type": "object",
+    "required": ["document_info", "content", "extraction_summary"],
+    "properties": {
+        "document_info": {
             "type": "object",
-            "required": ["document_info", "content", "extraction_summary"],
+            "required": ["filename", "page_count", "processing_timestamp"],
             "properties": {
-                "document_info": {
+                "filename": {"type": "string"},
+                "page_count": {"type": "integer", "minimum": 0},
+                "total_pages": {"type": "integer", "minimum": 0},
+                "processing_timestamp": {"type": "string"},
+                "metadata": {
                     "type": "object",
-                    "required": ["filename", "page_count", "processing_timestamp"],
                     "properties": {
-                        "filename": {"type": "string"},
-                        "page_count": {"type": "integer", "minimum": 0},
-                        "total_pages": {"type": "integer", "minimum": 0},
-                        "processing_timestamp": {"type": "string"},
-                        "metadata": {
-                            "type": "object",
-                            "properties": {
-                                "title": {"type": "string"},
-                                "author": {"type": "string"},
-                                "subject": {"type": "string"},
-                                "creator": {"type": "string"},
-                                "producer": {"type": "string"},
-                                "creation_date": {"type": "string"},
-                                "modification_date": {"type": "string"}
-                            }
-                        }
+                        "title": {"type": "string"},
+                        "author": {"type": "string"},
+                        "subject": {"type": "string"},
+                        "creator": {"type": "string"},
+                        "producer": {"type": "string"},
+                        "creation_date": {"type": "string"},
+                        "modification_date": {"type": "string"}
                     }
-                },
-                "content": {
-                    "type": "object",
-                    "required": ["text_blocks", "images", "tables", "page_structure"],
-                    "properties": {
-                        "text_blocks": {
-                            "type": "array",
-                            "items": {
+                }
+            }
+        },
+        "content": {
+            "type": "object",
+            "required": ["text_blocks", "images", "tables", "page_structure"],
+            "properties": {
+                "text_blocks": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["page", "block_id", "type", "text"],
+                        "properties": {
+                            "page": {"type": "integer", "minimum": 1},
+                            "block_id": {"type": "string"},
+                            "type": {
+                                "type": "string",
+                                "enum": ["header", "paragraph", "list", "table_text", "caption", "unknown"]
+                            },
+                            "text": {"type": "string"},
+                            "position": {
                                 "type": "object",
-                                "required": ["page", "block_id", "type", "text"],
                                 "properties": {
-                                    "page": {"type": "integer", "minimum": 1},
-                                    "block_id": {"type": "string"},
-                                    "type": {
-                                        "type": "string",
-                                        "enum": ["header", "paragraph", "list", "table_text", "caption", "unknown"]
-                                    },
-                                    "text": {"type": "string"},
-                                    "position": {
-                                        "type": "object",
-                                        "properties": {
-                                            "x0": {"type": "number"},
-                                            "y0": {"type": "number"},
-                                            "x1": {"type": "number"},
-                                            "y1": {"type": "number"}
-                                        }
-                                    },
-                                    "fonts": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    },
-                                    "font_sizes": {
-                                        "type": "array",
-                                        "items": {"type": "number"}
-                                    }
+                                    "x0": {"type": "number"},
+                                    "y0": {"type": "number"},
+                                    "x1": {"type": "number"},
+                                    "y1": {"type": "number"}
                                 }
+                            },
+                            "fonts": {
+                                "type": "array",
+                                "items": {"type": "string"}
+                            },
+                            "font_sizes": {
+                                "type": "array",
+                                "items": {"type": "number"}
                             }
-                        },
-                        "images": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "required": ["page", "image_id"],
-                                "properties": {
-                                    "page": {"type": "integer", "minimum": 1},
-                                    "image_id": {"type": "string"},
-                                    "width": {"type": "integer"},
-                                    "height": {"type": "integer"},
-                                    "colorspace": {"type": "string"},
-                                    "format": {"type": "string"}
+                        }
+                    }
+                },
+                "images": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["page", "image_id"],
+                        "properties": {
+                            "page": {"type": "integer", "minimum": 1},
+                            "image_id": {"type": "string"},
+                            "width": {"type": "integer"},
+                            "height": {"type": "integer"},
+                            "colorspace": {"type": "string"},
+                            "format": {"type": "string"}
+                        }
+                    }
+                },
+                "tables": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["page", "table_id", "type"],
+                        "properties": {
+                            "page": {"type": "integer", "minimum": 1},
+                            "table_id": {"type": "string"},
+                            "type": {"type": "string"},
+                            "rows": {"type": "integer", "minimum": 0},
+                            "columns": {"type": "integer", "minimum": 0},
+                            "position": {"type": "object"},
+                            "data": {
+                                "type": "array",
+                                "items": {
+                                    "type": "array",
+                                    "items": {"type": "string"}
                                 }
                             }
-                        },
-                        "tables": {
-                            "type": "array",
-                            "items": {
+                        }
+                    }
+                },
+                "page_structure": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["page"],
+                        "properties": {
+                            "page": {"type": "integer", "minimum": 1},
+                            "dimensions": {
                                 "type": "object",
-                                "required": ["page", "table_id", "type"],
                                 "properties": {
-                                    "page": {"type": "integer", "minimum": 1},
-                                    "table_id": {"type": "string"},
-                                    "type": {"type": "string"},
-                                    "rows": {"type": "integer", "minimum": 0},
-                                    "columns": {"type": "integer", "minimum": 0},
-                                    "position": {"type": "object"},
-                                    "data": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "array",
-                                            "items": {"type": "string"}
-                                        }
-                                    }
+                                    "width": {"type": "number"},
+                                    "height": {"type": "number"}
                                 }
-                            }
-                        },
-                        "page_structure": {
-                            "type": "array",
-                            "items": {
+                            },
+                            "text_coverage": {"type": "number"},
+                            "element_counts": {
                                 "type": "object",
-                                "required": ["page"],
                                 "properties": {
-                                    "page": {"type": "integer", "minimum": 1},
-                                    "dimensions": {
-                                        "type": "object",
-                                        "properties": {
-                                            "width": {"type": "number"},
-                                            "height": {"type": "number"}
-                                        }
-                                    },
-                                    "text_coverage": {"type": "number"},
-                                    "element_counts": {
-                                        "type": "object",
-                                        "properties": {
-                                            "text_blocks": {"type": "integer"},
-                                            "images": {"type": "integer"}
-                                        }
-                                    },
-                                    "layout_type": {
-                                        "type": "string",
-                                        "enum": ["text_heavy", "image_heavy", "mixed", "standard", "empty"]
-                                    }
+                                    "text_blocks": {"type": "integer"},
+                                    "images": {"type": "integer"}
                                 }
+                            },
+                            "layout_type": {
+                                "type": "string",
+                                "enum": ["text_heavy", "image_heavy", "mixed", "standard", "empty"]
                             }
                         }
                     }
-                },
-                "extraction_summary": {
-                    "type": "object",
-                    "required": ["processing_complete"],
-                    "properties": {
-                        "total_text_blocks": {"type": "integer", "minimum": 0},
-                        "total_images": {"type": "integer", "minimum": 0},
-                        "total_tables": {"type": "integer", "minimum": 0},
-                        "processing_complete": {"type": "boolean"}
-                    }
                 }
             }
+        },
+        "extraction_summary": {
+            "type": "object",
+            "required": ["processing_complete"],
+            "properties": {
+                "total_text_blocks": {"type": "integer", "minimum": 0},
+                "total_images": {"type": "integer", "minimum": 0},
+                "total_tables": {"type": "integer", "minimum": 0},
+                "processing_complete": {"type": "boolean"}
+            }
         }
+    }
+}
+
+# validate_fast() checks content arrays at least this long in a process pool.
+# In-process validation takes about 0.09ms per text block, while starting a
+# call's four spawned workers and shipping the items to them adds about 0.5s,
+# so a four-core split only pays off from roughly 7500 blocks.
+_PARALLEL_ITEMS_THRESHOLD = 10000
+_ITEM_CHUNKSIZE = 256
+_MAX_ITEM_WORKERS = 4
+
+# Shared validators keyed by absolute schema path, stored with the file's mtime
+_INSTANCE_CACHE = {}
+
+# Built validator state keyed by a hash of the canonical schema JSON, so equal
+# schemas loaded from different files or instances share one build
+_VALIDATOR_CACHE = {}
+
+# Validator classes extended with the set-based enum check, keyed by base class
+_ENUM_SET_VALIDATORS = {}
+
+def _with_enum_sets(validator_class):
+    """
+    Extend a jsonschema validator class so string enum checks use a frozenset
+    
+    Args:
+        validator_class: Validator class picked for the schema
         
-        # Save the default schema
-        self._save_schema()
+    Returns:
+        Extended validator class; non-string instances keep the stock check
+    """
+    extended = _ENUM_SET_VALIDATORS.get(validator_class)
+    if extended is not None:
+        return extended
     
-    def _save_schema(self):
-        """Save the schema to file"""
+    stock_enum = validator_class.VALIDATORS["enum"]
+    enum_sets = {}
+    
+    def enum(validator, enums, instance, schema):
+        # A string can only equal a string member, so set membership is exact
+        if isinstance(instance, str):
+            cached = enum_sets.get(id(enums))
+            if cached is None or cached[0] is not enums:
+                cached = (enums, frozenset(e for e in enums if isinstance(e, str)))
+                enum_sets[id(enums)] = cached
+            if instance not in cached[1]:
+                yield jsonschema.ValidationError(f"{instance!r} is not one of {enums!r}")
+            return
+        yield from stock_enum(validator, enums, instance, schema)
+    
+    extended = jsonschema.validators.extend(validator_class, {"enum": enum})
+    _ENUM_SET_VALIDATORS[validator_class] = extended
+    return extended
+
+# Per-worker item validators keyed by content array name, built by _init_item_worker
+_worker_item_validators = {}
+
+def _init_item_worker(item_schemas):
+    """Build one validator per content array, once per validate_fast() worker"""
+    for name, item_schema in item_schemas.items():
+        validator_class = _with_enum_sets(jsonschema.validators.validator_for(item_schema))
+        _worker_item_validators[name] = validator_class(item_schema)
+
+def _first_invalid_item(args):
+    """Index of the first invalid item in a chunk, checked in a pool worker; None if all are valid"""
+    name, items = args
+    validator = _worker_item_validators[name]
+    for index, item in enumerate(items):
+        if not validator.is_valid(item):
+            return index
+    return None
+
+def _name_lookup(names):
+    """Set of the names for longer "required" lists, the list itself otherwise"""
+    return set(names) if len(names) > 4 else names
+
+class SchemaValidator:
+    """
+    Validates JSON output against the required schema for Adobe Hackathon Challenge 1a
+    """
+    
+    def __init__(self, schema_path: str = "output_schema.json"):
+        # Prefer SchemaValidator.get(path), which shares one instance per schema file.
+        # Nothing is read until the schema is first needed
+        self.schema_path = schema_path
+        self._schema_data = None
+        self._summary = None
+        self._validator_ready = False
+        self._validator = None
+        self._fast_validate = None
+        self._required_checks = ()
+        self._item_schemas = {}
+        self._schema_error = None
+    
+    @classmethod
+    def get(cls, schema_path: str = "output_schema.json") -> "SchemaValidator":
+        """
+        Get a shared validator for a schema file
+        
+        Args:
+            schema_path: Path to the schema file
+            
+        Returns:
+            The cached SchemaValidator for the path, rebuilt if the file changed
+        """
+        key = os.path.abspath(schema_path)
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            mtime = None  # missing file; the default schema is created on first use
+        
+        cached = _INSTANCE_CACHE.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        validator = cls(schema_path)
+        _INSTANCE_CACHE[key] = (mtime, validator)
+        return validator
+    
+    @property
+    def _schema(self) -> Dict[str, Any]:
+        """The schema, loaded from schema_path on first access"""
+        if self._schema_data is None:
+            self._load_schema()
+        return self._schema_data
+    
+    @_schema.setter
+    def _schema(self, schema: Dict[str, Any]):
+        self._schema_data = schema
+        self._summary = None
+        self._validator_ready = False  # rebuild validators and summary for the new schema
+    
+    def _ensure_validator(self):
+        """Build the validators on first use, or after the schema changed"""
+        if not self._validator_ready:
+            self._build_validator()
+            self._validator_ready = True
+    
+    def _load_schema(self):
+        """Load the JSON schema from file"""
         try:
-            with open(self.schema_path, 'w') as f:
-                json.dump(self._schema, f, indent=2)
+            with open(self.schema_path, 'rb') as f:
+                self._schema = load_json(f.read())
+        except FileNotFoundError:
+            # If schema file doesn't exist, create a default one
+            self._create_default_schema()
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON in schema file: {str(e)}")
+    
+    def _build_validator(self):
+        """Check the schema once and build a validator that is reused for every call"""
+        key = hashlib.blake2b(json.dumps(self._schema, sort_keys=True).encode(), digest_size=16).digest()
+        built = _VALIDATOR_CACHE.get(key)
+        if built is None:
+            built = self._compile_validators(self._schema)
+            _VALIDATOR_CACHE[key] = built
+        
+        (self._schema_error, self._validator, self._fast_validate,
+         self._required_checks, self._item_schemas) = built
+    
+    @classmethod
+    def _compile_validators(cls, schema: Dict[str, Any]) -> tuple:
+        """
+        Check a schema and build its validators
+        
+        Returns:
+            Tuple of (schema_error, validator, fast_validate, required_checks, item_schemas)
+        """
+        # Same validator class jsonschema.validate would pick from "$schema"
+        validator_class = jsonschema.validators.validator_for(schema)
+        try:
+            validator_class.check_schema(schema)
+        except jsonschema.SchemaError as e:
+            # Reported from validate()/validate_partial() rather than raised here
+            return e, None, None, (), {}
+        
+        # Compiled fast path for the common case of valid data; use_default=False
+        # keeps it from writing schema defaults into the validated data
+        fast_validate = None
+        if fastjsonschema is not None:
+            try:
+                fast_validate = fastjsonschema.compile(schema, use_default=False)
+            except fastjsonschema.JsonSchemaDefinitionException:
+                pass  # keep jsonschema for schemas fastjsonschema can't compile
+        
+        return (None, _with_enum_sets(validator_class)(schema), fast_validate,
+                cls._collect_required_checks(schema), cls._collect_item_schemas(schema))
+    
+    @staticmethod
+    def _collect_required_checks(schema: Dict[str, Any]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """
+        Collect the required keys of the top level and of its direct sections
+        
+        Returns:
+            Tuple of (section name, or "" for the top level, required keys)
+        """
+        checks = []
+        if not isinstance(schema, dict):
+            return ()
+        
+        if isinstance(schema.get("required"), list):
+            checks.append(("", tuple(schema["required"])))
+        
+        for name, prop_def in schema.get("properties", {}).items():
+            if isinstance(prop_def, dict) and isinstance(prop_def.get("required"), list):
+                checks.append((name, tuple(prop_def["required"])))
+        
+        return tuple(checks)
+    
+    @staticmethod
+    def _collect_item_schemas(schema: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect the item subschemas of the arrays under "content"
+        
+        Returns:
+            Dict of array name to a standalone item schema, empty when the
+            schema uses $ref (items could not be validated on their own)
+        """
+        if not isinstance(schema, dict) or '"$ref"' in json.dumps(schema):
+            return {}
+        
+        content_def = schema.get("properties", {}).get("content")
+        if not isinstance(content_def, dict):
+            return {}
+        
+        item_schemas = {}
+        for name, prop_def in content_def.get("properties", {}).items():
+            items_def = prop_def.get("items") if isinstance(prop_def, dict) else None
+            if isinstance(items_def, dict):
+                item_schema = dict(items_def)
+                # Keep the draft of the full schema for the standalone item schema
+                if "$schema" in schema:
+                    item_schema["$schema"] = schema["$schema"]
+                item_schemas[name] = item_schema
+        
+        return item_schemas
+    
+    def _schema_without_items(self, names) -> Dict[str, Any]:
+        """Shallow copy of the schema with the item subschemas of the named content arrays removed"""
+        schema = dict(self._schema)
+        schema["properties"] = dict(schema["properties"])
+        content_def = schema["properties"]["content"] = dict(schema["properties"]["content"])
+        content_def["properties"] = dict(content_def["properties"])
+        for name in names:
+            array_def = content_def["properties"][name] = dict(content_def["properties"][name])
+            del array_def["items"]
+        return schema
+    
+    def _missing_required(self, data: Any) -> list:
+        """Cheap presence check for required keys, run before any schema traversal"""
+        if not isinstance(data, dict):
+            return []
+        
+        missing = []
+        for section, required in self._required_checks:
+            target = data.get(section) if section else data
+            if isinstance(target, dict):
+                prefix = f"{section}." if section else ""
+                missing.extend(prefix + key for key in required if key not in target)
+        
+        return missing
+    
+    def _create_default_schema(self):
+        """Use the default schema when no schema file exists (nothing is written to disk)"""
+        self._schema = copy.deepcopy(DEFAULT_SCHEMA)
+    
+    @classmethod
+    def persist_default(cls, schema_path: str = "output_schema.json"):
+        """
+        Write the default schema to a file
+        
+        Args:
+            schema_path: Path of the schema file to write
+        """
+        validator = cls(schema_path)
+        validator._schema = copy.deepcopy(DEFAULT_SCHEMA)
+        validator._save_schema()
+    
+    def _save_schema(self, pretty: bool = False):
+        """
+        Save the schema to file
+        
+        Args:
+            pretty: Indent the output for human readers; compact by default
+        """
+        try:
+            with open(self.schema_path, 'wb') as f:
+                f.write(dump_json(self._schema, indent=pretty))
         except Exception as e:
-            print(f"Warning: Could not save schema file: {str(e)}")
+            logger.warning(f"Could not save schema file: {str(e)}")
     
     def get_schema(self) -> Dict[str, Any]:
-        """Get the current schema"""
+        """Get the current schema (shared, so treat it as read-only)"""
         return self._schema
     
+    @staticmethod
+    def intern_block_types(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Intern the enum-valued block "type" and page "layout_type" strings in place
+        
+        Args:
+            data: Output data, typically loaded from a JSON file
+            
+        Returns:
+            The same data object
+        """
+        content = data.get("content") if isinstance(data, dict) else None
+        if not isinstance(content, dict):
+            return data
+        
+        for key, field in (("text_blocks", "type"), ("page_structure", "layout_type")):
+            items = content.get(key)
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if isinstance(item, dict):
+                    value = item.get(field)
+                    if type(value) is str:
+                        item[field] = sys.intern(value)
+        
+        return data
+    
     def validate(self, data: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Validate data against the schema
@@ -198,16 +495,103 @@ class SchemaValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
+        self._ensure_validator()
+        if self._schema_error is not None:
+            return False, f"Schema error: {str(self._schema_error)}"
+        
+        # Missing required keys fail without running either validator
+        missing = self._missing_required(data)
+        if missing:
+            return False, f"Missing required properties: {', '.join(missing)}"
+        
+        if self._fast_validate is not None:
+            try:
+                self._fast_validate(data)
+                return True, ""
+            except Exception:
+                pass  # let jsonschema produce the error message below
+        
+        try:
+            # Report the most relevant error, as jsonschema.validate does
+            error = jsonschema.exceptions.best_match(self._validator.iter_errors(data))
+            if error is None:
+                return True, ""
+            return False, str(error)
+        except Exception as e:
+            return False, f"Validation error: {str(e)}"
+    
+    def validate_fast(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Validate data, checking the items of large content arrays in a process pool
+        
+        Documents whose content arrays are all shorter than
+        _PARALLEL_ITEMS_THRESHOLD, or machines with a single CPU, are handed to
+        validate() unchanged. Errors are reported in the same form validate() uses.
+        
+        Args:
+            data: The data to validate
+            
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        self._ensure_validator()
+        content = data.get("content") if isinstance(data, dict) else None
+        large = []
+        if self._schema_error is None and isinstance(content, dict):
+            large = [name for name in self._item_schemas
+                     if isinstance(content.get(name), list)
+                     and len(content[name]) >= _PARALLEL_ITEMS_THRESHOLD]
+        if not large or (os.cpu_count() or 1) < 2:
+            return self.validate(data)
+        
+        missing = self._missing_required(data)
+        if missing:
+            return False, f"Missing required properties: {', '.join(missing)}"
+        
+        if self._fast_validate is not None:
+            try:
+                self._fast_validate(data)
+                return True, ""
+            except Exception:
+                pass  # find the error with jsonschema below
+        
         try:
-            jsonschema.validate(instance=data, schema=self._schema)
+            # Everything except the large arrays' items stays on this process
+            shell_validator = type(self._validator)(self._schema_without_items(large))
+            error = jsonschema.exceptions.best_match(shell_validator.iter_errors(data))
+            if error is not None:
+                return False, str(error)
+            
+            # Item schemas reach each worker once, through the pool initializer
+            item_schemas = {name: self._item_schemas[name] for name in large}
+            starts = [(name, start) for name in large for start in range(0, len(content[name]), _ITEM_CHUNKSIZE)]
+            chunks = ((name, content[name][start:start + _ITEM_CHUNKSIZE]) for name, start in starts)
+            workers = min(os.cpu_count() or 1, _MAX_ITEM_WORKERS, len(starts))
+            
+            # Leaving the with block terminates the pool, which also drops the
+            # chunks still queued when an invalid item ends the check early
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(workers, initializer=_init_item_worker, initargs=(item_schemas,)) as pool:
+                # imap keeps input order, so the first invalid item found is the earliest one
+                for (name, start), index in zip(starts, pool.imap(_first_invalid_item, chunks)):
+                    if index is not None:
+                        index += start
+                        return False, self._item_error_message(name, index, content[name][index])
+            
             return True, ""
-        except jsonschema.ValidationError as e:
-            return False, str(e)
-        except jsonschema.SchemaError as e:
-            return False, f"Schema error: {str(e)}"
         except Exception as e:
             return False, f"Validation error: {str(e)}"
     
+    def _item_error_message(self, name: str, index: int, item: Any) -> str:
+        """Error text for an invalid content array item, in the same form validate() reports"""
+        items_def = self._schema["properties"]["content"]["properties"][name]["items"]
+        error = jsonschema.exceptions.best_match(self._validator.evolve(schema=items_def).iter_errors(item))
+        
+        # Locate the error from the document root, as a full validation would
+        error.path.extendleft(reversed(("content", name, index)))
+        error.schema_path.extendleft(reversed(("properties", "content", "properties", name, "items")))
+        return str(error)
+    
     def validate_partial(self, data: Dict[str, Any], path: str = "") -> Tuple[bool, list]:
         """
         Validate data and return detailed validation results
@@ -220,22 +604,22 @@ class SchemaValidator:
             Tuple of (is_valid, list_of_errors)
         """
         errors = []
+        self._ensure_validator()
         
         try:
-            jsonschema.validate(instance=data, schema=self._schema)
-            return True, []
-        except jsonschema.ValidationError as e:
-            # Collect all validation errors
-            validator = jsonschema.Draft7Validator(self._schema)
-            for error in validator.iter_errors(data):
-                error_path = ".".join(str(p) for p in error.absolute_path)
+            if self._schema_error is not None:
+                raise self._schema_error
+            
+            # Collect all validation errors in a single pass
+            for error in self._validator.iter_errors(data):
+                error_path = ".".join(map(str, error.absolute_path))
                 errors.append({
                     "path": error_path,
                     "message": error.message,
                     "invalid_value": error.instance
                 })
             
-            return False, errors
+            return not errors, errors
         except Exception as e:
             errors.append({
                 "path": path,
@@ -245,42 +629,58 @@ class SchemaValidator:
             return False, errors
     
     def get_schema_summary(self) -> Dict[str, Any]:
-        """Get a summary of the schema requirements"""
-        def extract_properties(obj, path=""):
-            """Recursively extract property information"""
-            if not isinstance(obj, dict):
-                return {}
+        """Get a summary of the schema requirements (computed once per schema)"""
+        if self._summary is None:
+            self._summary = self._build_schema_summary()
+        return self._summary
+    
+    def _build_schema_summary(self) -> Dict[str, Any]:
+        """Build the schema summary returned by get_schema_summary"""
+        schema = self._schema
+        properties = {}
+        
+        # Depth-first walk with an explicit stack of (property iterator, required
+        # names, parent path); each level is iterated lazily, so nested properties
+        # are listed right after their parent, as a recursive walk would
+        stack = []
+        if isinstance(schema, dict) and "properties" in schema:
+            stack.append((iter(schema["properties"].items()), _name_lookup(schema.get("required", [])), ""))
+        
+        while stack:
+            items, required, path = stack[-1]
+            entry = next(items, None)
+            if entry is None:
+                stack.pop()
+                continue
             
-            properties = {}
+            prop_name, prop_def = entry
+            prop_path = f"{path}.{prop_name}" if path else prop_name
+            prop_type = prop_def.get("type", "unknown")
+            prop_info = {
+                "type": prop_type,
+                "required": prop_name in required,
+                "path": prop_path
+            }
             
-            if "properties" in obj:
-                for prop_name, prop_def in obj["properties"].items():
-                    prop_path = f"{path}.{prop_name}" if path else prop_name
-                    prop_info = {
-                        "type": prop_def.get("type", "unknown"),
-                        "required": prop_name in obj.get("required", []),
-                        "path": prop_path
-                    }
-                    
-                    if "enum" in prop_def:
-                        prop_info["allowed_values"] = prop_def["enum"]
-                    
-                    properties[prop_path] = prop_info
-                    
-                    # Recursively process nested objects
-                    if prop_def.get("type") == "object":
-                        nested = extract_properties(prop_def, prop_path)
-                        properties.update(nested)
-                    elif prop_def.get("type") == "array" and "items" in prop_def:
-                        if prop_def["items"].get("type") == "object":
-                            nested = extract_properties(prop_def["items"], f"{prop_path}[]")
-                            properties.update(nested)
+            if "enum" in prop_def:
+                prop_info["allowed_values"] = prop_def["enum"]
+            
+            properties[prop_path] = prop_info
+            
+            # Descend into nested objects
+            nested = None
+            if prop_type == "object":
+                nested, nested_path = prop_def, prop_path
+            elif prop_type == "array" and "items" in prop_def:
+                if prop_def["items"].get("type") == "object":
+                    nested, nested_path = prop_def["items"], f"{prop_path}[]"
             
-            return properties
+            if nested is not None and "properties" in nested:
+                stack.append((iter(nested["properties"].items()), _name_lookup(nested.get("required", [])), nested_path))
         
         return {
-            "title": self._schema.get("title", ""),
-            "description": self._schema.get("description", ""),
-            "required_sections": self._schema.get("required", []),
-            "properties": extract_properties(self._schema)
+            "title": schema.get("title", ""),
+            "description": schema.get("description", ""),
+            "required_sections": schema.get("required", []),
+            "properties": properties
         }
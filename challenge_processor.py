@@ -5,31 +5,56 @@ Extracts title and headings (H1, H2, H3) from PDF documents
 """
 
 import os
-import json
 import time
 import fitz  # PyMuPDF
+from collections import namedtuple
+from contextlib import nullcontext
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import re
 import logging
+import statistics
+
+from pdf_common import TEXT_FLAGS, EMPTY_TEXT_DICT, page_has_text, find_pdf_files, spawn_pool
+from utils import dump_json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Heuristics used to tell headings from body text
+_COMMON_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+_HEADING_KEYWORDS = ('chapter', 'section', 'introduction', 'conclusion', 'summary',
+                     'overview', 'background', 'methodology', 'results', 'discussion')
+_NUMBERING_RE = re.compile(r'^\d+(\.\d+)*\.?\s+')  # 1.1, 1.2.3, etc.
+
+# Body font size is estimated from a sample of spans on the first few pages
+_BODY_SAMPLE_PAGES = 3
+_BODY_SAMPLE_SPANS = 500
+
+# Fallback for spans without a bbox
+_NO_BBOX = (0, 0, 0, 0)
+
+# Per-span record; a tuple is far smaller than a dict for pages with thousands of spans
+_Span = namedtuple("_Span", "text size flags font y")
+
 class PDFHeadingExtractor:
     """Extract title and headings from PDF documents for Adobe Hackathon Challenge 1a"""
     
+    __slots__ = ('processed_count', 'error_count')
+    
     def __init__(self):
         self.processed_count = 0
         self.error_count = 0
         
-    def extract_title_and_headings(self, pdf_path: str) -> Dict[str, Any]:
+    def extract_title_and_headings(self, pdf_path: str, max_pages: int = 50) -> Dict[str, Any]:
         """
         Extract title and headings from PDF according to challenge requirements
         
         Args:
             pdf_path: Path to the PDF file
+            max_pages: Maximum number of pages to scan for headings
             
         Returns:
             Dictionary with title and outline (headings) in required format
@@ -40,11 +65,11 @@ class PDFHeadingExtractor:
             # Open PDF document
             doc = fitz.open(pdf_path)
             
-            # Extract title from document metadata or first page
-            title = self._extract_title(doc)
+            # Extract headings from all pages, keeping the parsed first page for the title
+            outline, first_page_blocks = self._extract_headings(doc, max_pages)
             
-            # Extract headings from all pages
-            outline = self._extract_headings(doc)
+            # Extract title from document metadata or first page
+            title = self._extract_title(doc, first_page_blocks)
             
             # Structure output according to challenge requirements
             result = {
@@ -64,8 +89,8 @@ class PDFHeadingExtractor:
             logger.error(f"Error processing {pdf_path}: {str(e)}")
             raise Exception(f"PDF processing failed: {str(e)}")
     
-    def _extract_title(self, doc: fitz.Document) -> str:
-        """Extract document title from metadata or first page"""
+    def _extract_title(self, doc: fitz.Document, first_page_blocks: Dict = None) -> str:
+        """Extract document title from metadata or first page (reusing its parsed blocks if given)"""
         
         # Try to get title from metadata first
         metadata = doc.metadata
@@ -76,10 +101,10 @@ class PDFHeadingExtractor:
         
         # If no metadata title, extract from first page
         if len(doc) > 0:
-            first_page = doc[0]
-            
             # Get text blocks with formatting
-            blocks = first_page.get_text("dict")
+            blocks = first_page_blocks
+            if blocks is None:
+                blocks = doc[0].get_text("dict", flags=TEXT_FLAGS)
             
             # Find the largest text on the first page (likely the title)
             largest_text = ""
@@ -89,12 +114,17 @@ class PDFHeadingExtractor:
                 if "lines" in block:
                     for line in block["lines"]:
                         for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
+                            # Only text larger than the current candidate can win, so
+                            # reject on size before touching the text at all
                             size = span.get("size", 0)
+                            if size <= max_size:
+                                continue
                             
-                            # Look for title-like text (large, short, on top of page)
-                            if (text and size > max_size and len(text) < 200 and 
-                                not text.isdigit() and len(text.split()) > 1):
+                            # Look for title-like text (large, short, on top of page);
+                            # a bounded split is enough to tell one word from several
+                            text = span.get("text", "").strip()
+                            if (text and len(text) < 200 and 
+                                not text.isdigit() and len(text.split(None, 1)) > 1):
                                 largest_text = text
                                 max_size = size
             
@@ -104,70 +134,91 @@ class PDFHeadingExtractor:
         # Fallback to filename without extension
         return Path(doc.name).stem if doc.name else "Untitled Document"
     
-    def _extract_headings(self, doc: fitz.Document) -> List[Dict[str, Any]]:
-        """Extract headings (H1, H2, H3) from all pages"""
+    def _extract_headings(self, doc: fitz.Document, max_pages: int = 50) -> Tuple[List[Dict[str, Any]], Dict]:
+        """
+        Extract headings (H1, H2, H3) from the first max_pages pages
+        
+        Returns:
+            Tuple of (headings, parsed text dict of the first page or None)
+        """
         
         headings = []
+        first_page_blocks = None
+        page_spans = []
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_headings = self._extract_headings_from_page(page, page_num + 1)
-            headings.extend(page_headings)
+        for page_num in range(min(len(doc), max_pages)):
+            # Get text blocks with detailed formatting, parsed once per page;
+            # image- or graphics-only pages are not parsed at all
+            page = doc.load_page(page_num)
+            if page_has_text(page):
+                blocks = page.get_text("dict", flags=TEXT_FLAGS)
+            else:
+                blocks = EMPTY_TEXT_DICT
+            page = None  # release the page before the next one is loaded
+            if page_num == 0:
+                first_page_blocks = blocks
+            
+            page_spans.append(self._collect_text_spans(blocks))
         
-        return headings
-    
-    def _extract_headings_from_page(self, page: fitz.Page, page_number: int) -> List[Dict[str, Any]]:
-        """Extract headings from a single page"""
+        # Font size statistics are fixed for the whole document, so body and
+        # heading sizes are judged consistently from page to page. The body size
+        # is the median of a sample from the first pages, which large headings,
+        # captions and footnotes don't skew the way they skew a mean.
+        sample = [span.size for spans in page_spans[:_BODY_SAMPLE_PAGES] for span in spans]
+        body_size = statistics.median(sample[:_BODY_SAMPLE_SPANS]) if sample else 12
+        max_size = max((span.size for spans in page_spans for span in spans), default=12)
         
-        headings = []
+        for page_num, text_spans in enumerate(page_spans):
+            page_headings = self._extract_headings_from_page(text_spans, page_num + 1, body_size, max_size)
+            headings.extend(page_headings)
         
-        # Get text blocks with detailed formatting
-        blocks = page.get_text("dict")
+        return headings, first_page_blocks
+    
+    def _collect_text_spans(self, blocks: Dict) -> List[_Span]:
+        """Collect the text spans of a page's parsed text dict, top to bottom"""
         
-        # Collect all text spans with their properties
         text_spans = []
+        add_span = text_spans.append  # bound once for the hot span loop
         for block in blocks.get("blocks", []):
             if "lines" in block:
                 for line in block["lines"]:
                     for span in line.get("spans", []):
                         text = span.get("text", "").strip()
                         if text and len(text) > 2:  # Ignore very short text
-                            text_spans.append({
-                                "text": text,
-                                "size": span.get("size", 0),
-                                "flags": span.get("flags", 0),  # Bold, italic flags
-                                "font": span.get("font", ""),
-                                "y": span.get("bbox", [0, 0, 0, 0])[1]  # Y position for ordering
-                            })
+                            add_span(_Span(
+                                text,
+                                span.get("size", 0),
+                                span.get("flags", 0),  # Bold, italic flags
+                                span.get("font", ""),
+                                (span.get("bbox") or _NO_BBOX)[1]  # Y position for ordering
+                            ))
         
-        if not text_spans:
-            return headings
+        # Sort by Y position (top to bottom); attrgetter keeps key extraction in C
+        text_spans.sort(key=attrgetter("y"))
         
-        # Sort by Y position (top to bottom)
-        text_spans.sort(key=lambda x: x["y"])
+        return text_spans
+    
+    def _extract_headings_from_page(self, text_spans: List[_Span], page_number: int,
+                                    body_size: float, max_size: float) -> List[Dict[str, Any]]:
+        """Extract headings from a single page's text spans using document font statistics"""
         
-        # Calculate font size statistics for heading detection
-        sizes = [span["size"] for span in text_spans]
-        avg_size = sum(sizes) / len(sizes) if sizes else 12
-        max_size = max(sizes) if sizes else 12
+        headings = []
         
         # Define thresholds for heading levels
         h1_threshold = max_size * 0.9  # Largest text
-        h2_threshold = avg_size * 1.4   # Significantly larger than average
-        h3_threshold = avg_size * 1.2   # Moderately larger than average
+        h2_threshold = body_size * 1.4   # Significantly larger than body text
+        h3_threshold = body_size * 1.2   # Moderately larger than body text
+        hint_threshold = body_size * 1.1  # Minimum size for keyword/numbering headings
         
         for span in text_spans:
-            text = span["text"]
-            size = span["size"]
-            flags = span["flags"]
+            text = span.text
+            size = span.size
             
-            # Skip if text looks like regular content
-            if self._is_likely_content(text):
-                continue
-            
-            # Determine heading level based on size and formatting
+            # Determine heading level based on size and formatting first: these are
+            # cheap numeric tests, so spans that can never become headings skip the
+            # string heuristics below
             level = None
-            is_bold = bool(flags & 2**4)  # Bold flag
+            is_bold = bool(span.flags & 2**4)  # Bold flag
             
             if size >= h1_threshold or (size >= h2_threshold and is_bold):
                 level = "H1"
@@ -175,11 +226,16 @@ class PDFHeadingExtractor:
                 level = "H2"
             elif size >= h3_threshold or is_bold:
                 level = "H3"
+            elif size <= hint_threshold:
+                continue
+            
+            # Skip if text looks like regular content
+            if self._is_likely_content(text):
+                continue
             
             # Additional heuristics for heading detection
             if not level and self._looks_like_heading(text, span):
-                if size > avg_size * 1.1:
-                    level = "H3"
+                level = "H3"
             
             if level:
                 headings.append({
@@ -201,26 +257,28 @@ class PDFHeadingExtractor:
         if text.endswith('.') and len(text) > 20:
             return True
         
+        # Short text can't fail the common-word test; a bounded split
+        # answers "more than 5 words?" without building the full list
+        if len(text.split(None, 5)) <= 5:
+            return False
+        
         # Skip text with too many common words
-        common_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
         words = text.lower().split()
-        if len(words) > 5 and sum(1 for word in words if word in common_words) > len(words) * 0.4:
+        if sum(1 for word in words if word in _COMMON_WORDS) > len(words) * 0.4:
             return True
         
         return False
     
-    def _looks_like_heading(self, text: str, span: Dict) -> bool:
+    def _looks_like_heading(self, text: str, span: _Span) -> bool:
         """Additional heuristics to identify headings"""
         
         # Check for numbering patterns (1.1, 1.2.3, etc.)
-        if re.match(r'^\d+(\.\d+)*\.?\s+', text):
+        if _NUMBERING_RE.match(text):
             return True
         
         # Check for chapter/section keywords
-        heading_keywords = ['chapter', 'section', 'introduction', 'conclusion', 'summary', 
-                           'overview', 'background', 'methodology', 'results', 'discussion']
-        
-        if any(keyword in text.lower() for keyword in heading_keywords):
+        lower_text = text.lower()
+        if any(keyword in lower_text for keyword in _HEADING_KEYWORDS):
             return True
         
         # Check if text is short and likely a heading
@@ -229,6 +287,23 @@ class PDFHeadingExtractor:
         
         return False
 
+def _process_one(pdf_path: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Extract title and headings from one PDF in a worker process
+    
+    Args:
+        pdf_path: Path to the PDF file (documents are not picklable, so paths are passed)
+        
+    Returns:
+        Tuple of (pdf_path, result or None, error message or None)
+    """
+    try:
+        logger.info(f"Processing: {Path(pdf_path).name}")
+        result = PDFHeadingExtractor().extract_title_and_headings(pdf_path)
+        return pdf_path, result, None
+    except Exception as e:
+        return pdf_path, None, str(e)
+
 def process_pdfs():
     """
     Main function to process all PDFs from input directory
@@ -265,7 +340,7 @@ def process_pdfs():
     extractor = PDFHeadingExtractor()
     
     # Find all PDF files
-    pdf_files = list(input_dir.glob("*.pdf"))
+    pdf_files = find_pdf_files(input_dir)
     
     if not pdf_files:
         logger.warning(f"No PDF files found in {input_dir}")
@@ -273,30 +348,36 @@ def process_pdfs():
     
     logger.info(f"Found {len(pdf_files)} PDF files to process")
     
-    # Process each PDF file
+    # Process PDF files in parallel; each file is independent and CPU-bound
     total_start_time = time.time()
+    max_workers = min(len(pdf_files), os.cpu_count() or 1, 4)
     
-    for pdf_file in pdf_files:
-        try:
-            logger.info(f"Processing: {pdf_file.name}")
-            
-            # Extract title and headings
-            result = extractor.extract_title_and_headings(str(pdf_file))
-            
-            # Generate output filename
-            output_filename = f"{pdf_file.stem}.json"
-            output_path = output_dir / output_filename
+    # With a single worker, a spawned interpreter only adds start-up time
+    with spawn_pool(max_workers) if max_workers > 1 else nullcontext() as pool:
+        results = pool.imap_unordered(_process_one, pdf_files) if pool is not None else map(_process_one, pdf_files)
+        for pdf_path, result, error in results:
+            pdf_file = Path(pdf_path)
             
-            # Save JSON output
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            extractor.processed_count += 1
-            logger.info(f"Saved: {output_filename}")
+            if error is not None:
+                logger.error(f"Failed to process {pdf_file.name}: {error}")
+                extractor.error_count += 1
+                continue
             
-        except Exception as e:
-            logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
-            extractor.error_count += 1
+            try:
+                # Generate output filename
+                output_filename = f"{pdf_file.stem}.json"
+                output_path = output_dir / output_filename
+                
+                # Save JSON output (written by the parent only, so outputs never interleave)
+                with open(output_path, 'wb') as f:
+                    f.write(dump_json(result))
+                
+                extractor.processed_count += 1
+                logger.info(f"Saved: {output_filename}")
+                
+            except Exception as e:
+                logger.error(f"Failed to save {pdf_file.name}: {str(e)}")
+                extractor.error_count += 1
     
     total_time = time.time() - total_start_time
     
@@ -6,6 +6,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Tuple
 import logging
 
+from pdf_common import TEXT_FLAGS, EMPTY_TEXT_DICT, DEVICE_COLORSPACES, BULLET_PREFIXES, page_has_text
+
 class PDFProcessor:
     """
     PDF processing engine that extracts structured data from PDF documents
@@ -84,38 +86,52 @@ class PDFProcessor:
         }
         
         for page_num in range(min(len(doc), max_pages)):
-            page = doc[page_num]
+            page = doc.load_page(page_num)
+            
+            # Parse the page once and share the result across the analyzers;
+            # image- or graphics-only pages are not parsed at all
+            if page_has_text(page):
+                text_dict = page.get_text("dict", flags=TEXT_FLAGS)
+            else:
+                text_dict = EMPTY_TEXT_DICT
             
             # Extract text blocks with positioning
-            text_blocks = self._extract_text_blocks(page, page_num)
+            text_blocks = self._extract_text_blocks(text_dict, page_num)
             content["text_blocks"].extend(text_blocks)
             
-            # Extract images
-            images = self._extract_images(page, page_num)
+            # Extract images; the image list is read once and shared with the
+            # structure analysis below
+            image_list = page.get_images()
+            images = self._extract_images(page, page_num, image_list)
             content["images"].extend(images)
             
             # Detect and extract tables
-            tables = self._detect_tables(page, page_num)
+            tables = self._detect_tables(text_dict, page_num)
             content["tables"].extend(tables)
             
             # Page structure analysis
-            page_structure = self._analyze_page_structure(page, page_num)
+            page_structure = self._analyze_page_structure(page, page_num, text_dict, len(image_list))
             content["page_structure"].append(page_structure)
+            
+            # Drop this page's objects before the next page is loaded
+            page = text_dict = None
         
         return content
     
-    def _extract_text_blocks(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
+    def _extract_text_blocks(self, text_dict: Dict, page_num: int) -> List[Dict[str, Any]]:
         """Extract text blocks with formatting and positioning information"""
         text_blocks = []
         
-        # Get text with detailed formatting
-        blocks = page.get_text("dict")
-        
-        for block_num, block in enumerate(blocks.get("blocks", [])):
+        for block_num, block in enumerate(text_dict.get("blocks", [])):
             if "lines" in block:  # Text block
                 block_text = []
-                block_fonts = set()
-                block_sizes = set()
+                span_fonts = []
+                span_sizes = []
+                
+                # Bind per-block methods once; the span loop is the hot path
+                add_font = span_fonts.append
+                add_size = span_sizes.append
+                add_line = block_text.append
                 
                 for line in block["lines"]:
                     line_text = []
@@ -123,15 +139,21 @@ class PDFProcessor:
                         text = span.get("text", "").strip()
                         if text:
                             line_text.append(text)
-                            block_fonts.add(span.get("font", ""))
-                            block_sizes.add(span.get("size", 0))
+                            add_font(span.get("font", ""))
+                            add_size(span.get("size", 0))
                     
                     if line_text:
-                        block_text.append(" ".join(line_text))
+                        add_line(" ".join(line_text))
                 
                 if block_text:
+                    # Deduplicate once per block (order-preserving) rather than
+                    # hashing into a set on every span
+                    block_fonts = list(dict.fromkeys(span_fonts))
+                    block_sizes = list(dict.fromkeys(span_sizes))
+                    
                     # Determine block type based on formatting
                     block_type = self._classify_text_block(block_text, block_fonts, block_sizes)
+                    x0, y0, x1, y1 = block.get("bbox") or (0, 0, 0, 0)
                     
                     text_blocks.append({
                         "page": page_num + 1,
@@ -139,18 +161,18 @@ class PDFProcessor:
                         "type": block_type,
                         "text": "\n".join(block_text),
                         "position": {
-                            "x0": block.get("bbox", [0, 0, 0, 0])[0],
-                            "y0": block.get("bbox", [0, 0, 0, 0])[1],
-                            "x1": block.get("bbox", [0, 0, 0, 0])[2],
-                            "y1": block.get("bbox", [0, 0, 0, 0])[3]
+                            "x0": x0,
+                            "y0": y0,
+                            "x1": x1,
+                            "y1": y1
                         },
-                        "fonts": list(block_fonts),
-                        "font_sizes": list(block_sizes)
+                        "fonts": block_fonts,
+                        "font_sizes": block_sizes
                     })
         
         return text_blocks
     
-    def _classify_text_block(self, text_lines: List[str], fonts: set, sizes: set) -> str:
+    def _classify_text_block(self, text_lines: List[str], fonts: List[str], sizes: List[float]) -> str:
         """Classify text block type based on content and formatting"""
         if not text_lines:
             return "unknown"
@@ -164,7 +186,8 @@ class PDFProcessor:
                 return "header"
         
         # Check for bullet points or lists
-        if any(line.strip().startswith(("•", "-", "*", "1.", "2.", "3.")) for line in text_lines):
+        # Lines are joined from stripped spans, so they never start with whitespace
+        if any(line.startswith(BULLET_PREFIXES) for line in text_lines):
             return "list"
         
         # Check for tables (structured data patterns)
@@ -192,41 +215,44 @@ class PDFProcessor:
         
         return tab_patterns > len(text_lines) * 0.5
     
-    def _extract_images(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
+    def _extract_images(self, page: fitz.Page, page_num: int, image_list: List[tuple]) -> List[Dict[str, Any]]:
         """Extract image information from page"""
         images = []
-        image_list = page.get_images()
         
         for img_num, img in enumerate(image_list):
             try:
-                # Get image info
-                xref = img[0]
-                pix = fitz.Pixmap(page.parent, xref)
+                # Get image info from the image list entry:
+                # (xref, smask, width, height, bpc, colorspace, ...)
+                xref, _, width, height, _, colorspace = img[:6]
+                
+                if colorspace not in DEVICE_COLORSPACES:
+                    # ICC-based, indexed and other colorspaces are only named
+                    # reliably by the decoded pixmap
+                    pix = fitz.Pixmap(page.parent, xref)
+                    width, height = pix.width, pix.height
+                    colorspace = pix.colorspace.name if pix.colorspace else "unknown"
+                    pix = None  # Clean up
                 
                 images.append({
                     "page": page_num + 1,
                     "image_id": f"page_{page_num + 1}_img_{img_num}",
-                    "width": pix.width,
-                    "height": pix.height,
-                    "colorspace": pix.colorspace.name if pix.colorspace else "unknown",
+                    "width": width,
+                    "height": height,
+                    "colorspace": colorspace,
                     "format": "image"
                 })
                 
-                pix = None  # Clean up
-                
             except Exception as e:
                 self.logger.warning(f"Could not extract image {img_num} from page {page_num + 1}: {str(e)}")
         
         return images
     
-    def _detect_tables(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
+    def _detect_tables(self, text_dict: Dict, page_num: int) -> List[Dict[str, Any]]:
         """Detect and extract table structures"""
         tables = []
         
-        # Simple table detection based on text alignment and spacing
-        text_dict = page.get_text("dict")
-        
-        # Look for rectangular arrangements of text
+        # Simple table detection based on text alignment and spacing:
+        # look for rectangular arrangements of text
         potential_tables = self._find_table_regions(text_dict, page_num)
         
         for table_num, table_region in enumerate(potential_tables):
@@ -299,19 +325,17 @@ class PDFProcessor:
         
         return table_data
     
-    def _analyze_page_structure(self, page: fitz.Page, page_num: int) -> Dict[str, Any]:
+    def _analyze_page_structure(self, page: fitz.Page, page_num: int, text_dict: Dict,
+                                image_count: int) -> Dict[str, Any]:
         """Analyze the overall structure of a page"""
         
         # Get page dimensions
         rect = page.rect
         
         # Analyze text distribution
-        text_blocks = page.get_text("dict").get("blocks", [])
+        text_blocks = text_dict.get("blocks", [])
         text_coverage = self._calculate_text_coverage(text_blocks, rect)
         
-        # Count different element types
-        image_count = len(page.get_images())
-        
         return {
             "page": page_num + 1,
             "dimensions": {
@@ -328,13 +352,12 @@ class PDFProcessor:
     
     def _calculate_text_coverage(self, text_blocks: List[Dict], page_rect: fitz.Rect) -> float:
         """Calculate what percentage of the page is covered by text"""
-        total_text_area = 0
-        
-        for block in text_blocks:
-            if "lines" in block and "bbox" in block:
-                bbox = block["bbox"]
-                area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
-                total_text_area += area
+        # One generator pass; pages hold too few blocks for array setup to pay off
+        total_text_area = sum(
+            (x1 - x0) * (y1 - y0)
+            for x0, y0, x1, y1 in (block["bbox"] for block in text_blocks
+                                   if "lines" in block and "bbox" in block)
+        )
         
         page_area = page_rect.width * page_rect.height
         return (total_text_area / page_area) * 100 if page_area > 0 else 0
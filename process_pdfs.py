@@ -5,24 +5,39 @@ Processes all PDFs from /app/input directory and outputs JSON files to /app/outp
 """
 
 import os
-import json
 import time
 import fitz  # PyMuPDF
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from pdf_common import TEXT_FLAGS, DEVICE_COLORSPACES, BULLET_PREFIXES, find_pdf_files, spawn_pool
+from utils import dump_json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Words that mark a text block as a caption
+_CAPTION_KEYWORDS = ("figure", "table", "chart")
+
+# Documents with at least this many pages are split across worker processes
+# when page-level parallelism is enabled. Starting the spawned page workers
+# costs about 0.35s, against roughly 1.5ms of serial parsing per text page,
+# so smaller documents are faster on a single process.
+_PARALLEL_PAGE_THRESHOLD = 300
+
 class PDFProcessor:
     """Enhanced PDF processor for Adobe Hackathon Challenge 1a"""
     
-    def __init__(self):
+    def __init__(self, page_workers: int = 1):
         self.processed_count = 0
         self.error_count = 0
+        # Worker processes for page-level parallelism on large documents; keep
+        # at 1 when the processor itself runs inside a worker pool
+        self.page_workers = page_workers
         
     def process_pdf(self, pdf_path: str) -> Dict[str, Any]:
         """
@@ -35,6 +50,7 @@ class PDFProcessor:
             Dictionary containing structured data conforming to output schema
         """
         start_time = time.time()
+        filename = os.path.basename(pdf_path)
         
         try:
             # Open PDF document
@@ -42,17 +58,25 @@ class PDFProcessor:
             
             # Extract document metadata
             metadata = doc.metadata
+            page_count = len(doc)
             
             # Process all pages (optimized for performance)
-            content = self._extract_content_optimized(doc)
+            if self.page_workers > 1 and page_count >= _PARALLEL_PAGE_THRESHOLD:
+                content = self._extract_content_parallel(pdf_path, page_count)
+            else:
+                content = self._extract_content_optimized(doc)
+            
+            # One clock read serves the timestamp, the summary and the log line
+            end_time = time.time()
+            processing_time = end_time - start_time
             
             # Structure output according to Adobe challenge schema
             result = {
                 "document_info": {
-                    "filename": Path(pdf_path).name,
-                    "page_count": len(doc),
-                    "total_pages": len(doc),
-                    "processing_timestamp": datetime.now().isoformat(),
+                    "filename": filename,
+                    "page_count": page_count,
+                    "total_pages": page_count,
+                    "processing_timestamp": datetime.fromtimestamp(end_time).isoformat(),
                     "metadata": {
                         "title": metadata.get("title", ""),
                         "author": metadata.get("author", ""),
@@ -69,14 +93,11 @@ class PDFProcessor:
                     "total_images": len(content.get("images", [])),
                     "total_tables": len(content.get("tables", [])),
                     "processing_complete": True,
-                    "processing_time_seconds": time.time() - start_time
+                    "processing_time_seconds": processing_time
                 }
             }
             
-            processing_time = time.time() - start_time
-            page_count = len(doc)
-            
-            logger.info(f"Processed {Path(pdf_path).name} in {processing_time:.2f}s - {page_count} pages")
+            logger.info(f"Processed {filename} in {processing_time:.2f}s - {page_count} pages")
             
             doc.close()
             return result
@@ -85,65 +106,128 @@ class PDFProcessor:
             logger.error(f"Error processing {pdf_path}: {str(e)}")
             raise Exception(f"PDF processing failed: {str(e)}")
     
-    def _extract_content_optimized(self, doc: fitz.Document) -> Dict[str, Any]:
-        """Extract content with optimizations for performance"""
-        content = {
+    def _extract_content_parallel(self, pdf_path: str, page_count: int) -> Dict[str, Any]:
+        """
+        Extract content with contiguous page ranges spread over worker processes
+        
+        MuPDF is not thread-safe, so pages are split across processes that each
+        open their own copy of the document rather than across threads.
+        """
+        workers = min(self.page_workers, page_count)
+        chunk_size = -(-page_count // workers)  # ceiling division
+        ranges = [(pdf_path, start, min(start + chunk_size, page_count))
+                  for start in range(0, page_count, chunk_size)]
+        
+        content = self._new_content()
+        
+        with spawn_pool(len(ranges), maxtasksperchild=None) as pool:
+            # map returns the ranges in order, so pages stay in document order
+            for part in pool.map(_extract_page_range, ranges):
+                for key, items in part.items():
+                    content[key].extend(items)
+        
+        return content
+    
+    def _new_content(self) -> Dict[str, Any]:
+        """Create an empty content dict"""
+        return {
             "text_blocks": [],
             "images": [],
             "tables": [],
             "page_structure": []
         }
+    
+    def _extract_content_optimized(self, doc: fitz.Document, pages: Optional[range] = None) -> Dict[str, Any]:
+        """Extract content with optimizations for performance (all pages unless a range is given)"""
+        content = self._new_content()
+        
+        if pages is None:
+            pages = range(len(doc))
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
+        # Let the document iterate its own pages instead of indexing it per page
+        for page in doc.pages(pages.start, pages.stop):
+            page_num = page.number
+            
+            # Parse the page and read its image list once; every analyzer
+            # below works from these shared results
+            blocks = page.get_text("dict", flags=TEXT_FLAGS).get("blocks", [])
+            image_list = page.get_images()
             
-            # Extract text blocks with positioning
-            text_blocks = self._extract_text_blocks_fast(page, page_num)
+            # Extract text blocks with positioning, and detect tables in the same
+            # pass over the blocks (simplified for performance)
+            text_blocks, tables = self._extract_blocks_fast(blocks, page_num)
             content["text_blocks"].extend(text_blocks)
             
             # Extract images efficiently
-            images = self._extract_images_fast(page, page_num)
+            images = self._extract_images_fast(page, page_num, image_list)
             content["images"].extend(images)
             
-            # Detect tables (simplified for performance)
-            tables = self._detect_tables_fast(page, page_num)
             content["tables"].extend(tables)
             
             # Page structure analysis
-            page_structure = self._analyze_page_structure_fast(page, page_num)
+            page_structure = self._analyze_page_structure_fast(page.rect, blocks, page_num, len(image_list))
             content["page_structure"].append(page_structure)
         
         return content
     
-    def _extract_text_blocks_fast(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
-        """Fast text extraction optimized for performance"""
-        text_blocks = []
+    def _extract_blocks_fast(self, blocks: List[Dict], page_num: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fast text block extraction and table detection in a single pass
         
-        # Use get_text("dict") for detailed formatting
-        blocks = page.get_text("dict")
+        Args:
+            blocks: The page's get_text("dict") blocks
+            page_num: Zero-based page number
+            
+        Returns:
+            Tuple of (text_blocks, tables)
+        """
+        text_blocks = []
+        tables = []
         
         block_id = 0
-        for block in blocks.get("blocks", []):
-            if "lines" in block:  # Text block
-                block_text = []
+        table_id = 0
+        for block in blocks:
+            lines = block.get("lines")
+            if lines:  # Text block
+                rows = []
                 fonts = set()
                 sizes = set()
+                # Consecutive spans almost always share a font and size, so the
+                # sets are only touched when the value changes
+                last_font = last_size = None
+                max_size = 0
+                # Blocks with more than two lines are table candidates
+                span_counts = [] if len(lines) > 2 else None
                 
-                for line in block["lines"]:
+                for line in lines:
                     line_text = []
-                    for span in line.get("spans", []):
+                    spans = line.get("spans", [])
+                    if span_counts is not None:
+                        span_counts.append(len(spans))
+                    for span in spans:
                         text = span.get("text", "").strip()
                         if text:
                             line_text.append(text)
-                            fonts.add(span.get("font", ""))
-                            sizes.add(span.get("size", 0))
+                            font = span.get("font", "")
+                            if font != last_font:
+                                fonts.add(font)
+                                last_font = font
+                            size = span.get("size", 0)
+                            if size != last_size:
+                                sizes.add(size)
+                                last_size = size
+                                if size > max_size:
+                                    max_size = size
                     
                     if line_text:
-                        block_text.append(" ".join(line_text))
+                        rows.append(line_text)
                 
-                if block_text:
+                if rows:
+                    block_text = [" ".join(row) for row in rows]
+                    
                     # Classify block type
-                    block_type = self._classify_text_block_fast(block_text, fonts, sizes)
+                    block_type = self._classify_text_block_fast(block_text, max_size)
+                    x0, y0, x1, y1 = block.get("bbox") or (0, 0, 0, 0)
                     
                     text_blocks.append({
                         "page": page_num + 1,
@@ -151,115 +235,97 @@ class PDFProcessor:
                         "type": block_type,
                         "text": "\n".join(block_text),
                         "position": {
-                            "x0": block.get("bbox", [0, 0, 0, 0])[0],
-                            "y0": block.get("bbox", [0, 0, 0, 0])[1],
-                            "x1": block.get("bbox", [0, 0, 0, 0])[2],
-                            "y1": block.get("bbox", [0, 0, 0, 0])[3]
+                            "x0": x0,
+                            "y0": y0,
+                            "x1": x1,
+                            "y1": y1
                         },
                         "fonts": list(fonts),
                         "font_sizes": list(sizes)
                     })
                     block_id += 1
+                    
+                    # Check for table-like structure; a table's rows are the
+                    # block's non-empty lines, split into their spans
+                    if span_counts is not None and len(set(span_counts)) <= 2 and max(span_counts) > 1:
+                        tables.append({
+                            "page": page_num + 1,
+                            "table_id": f"page_{page_num + 1}_table_{table_id}",
+                            "type": "table",
+                            "rows": len(rows),
+                            "columns": max(len(row) for row in rows),
+                            "position": block.get("bbox", {}),
+                            "data": rows
+                        })
+                        table_id += 1
         
-        return text_blocks
+        return text_blocks, tables
     
-    def _classify_text_block_fast(self, text_lines: List[str], fonts: set, sizes: set) -> str:
-        """Fast text block classification"""
+    def _classify_text_block_fast(self, text_lines: List[str], max_size: float) -> str:
+        """Fast text block classification (max_size is the block's largest font size)"""
         if not text_lines:
             return "unknown"
         
-        full_text = " ".join(text_lines).strip()
+        # Lines are joined from stripped spans, so they never carry leading or
+        # trailing whitespace and a single line is already the block's full text
         
-        # Quick classification based on text patterns
-        if len(text_lines) == 1 and len(full_text) < 100 and sizes and max(sizes) > 14:
+        # Quick classification based on text patterns; the numeric tests run first
+        if len(text_lines) == 1 and max_size > 14 and len(text_lines[0]) < 100:
             return "header"
-        elif any(line.strip().startswith(("•", "-", "*", "1.", "2.", "3.")) for line in text_lines):
+        
+        if any(line.startswith(BULLET_PREFIXES) for line in text_lines):
             return "list"
-        elif any(keyword in full_text.lower() for keyword in ["figure", "table", "chart"]):
+        
+        # Only captions need the joined text; lowercase it once rather than per keyword
+        lower_text = " ".join(text_lines).lower()
+        if any(keyword in lower_text for keyword in _CAPTION_KEYWORDS):
             return "caption"
-        else:
-            return "paragraph"
+        
+        return "paragraph"
     
-    def _extract_images_fast(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
+    def _extract_images_fast(self, page: fitz.Page, page_num: int, image_list: List[tuple]) -> List[Dict[str, Any]]:
         """Fast image extraction"""
         images = []
-        image_list = page.get_images()
         
         for img_num, img in enumerate(image_list):
             try:
-                xref = img[0]
-                pix = fitz.Pixmap(page.parent, xref)
+                # (xref, smask, width, height, bpc, colorspace, ...)
+                xref, _, width, height, _, colorspace = img[:6]
+                
+                if colorspace not in DEVICE_COLORSPACES:
+                    # ICC-based, indexed and other colorspaces are only named
+                    # reliably by the decoded pixmap
+                    pix = fitz.Pixmap(page.parent, xref)
+                    width, height = pix.width, pix.height
+                    colorspace = pix.colorspace.name if pix.colorspace else "unknown"
+                    pix = None  # Clean up
                 
                 images.append({
                     "page": page_num + 1,
                     "image_id": f"page_{page_num + 1}_img_{img_num}",
-                    "width": pix.width,
-                    "height": pix.height,
-                    "colorspace": pix.colorspace.name if pix.colorspace else "unknown",
+                    "width": width,
+                    "height": height,
+                    "colorspace": colorspace,
                     "format": "image"
                 })
                 
-                pix = None  # Clean up
-                
             except Exception:
                 # Skip problematic images for performance
                 continue
         
         return images
     
-    def _detect_tables_fast(self, page: fitz.Page, page_num: int) -> List[Dict[str, Any]]:
-        """Fast table detection"""
-        tables = []
-        
-        # Simple table detection for performance
-        text_dict = page.get_text("dict")
-        blocks = text_dict.get("blocks", [])
-        
-        table_id = 0
-        for block in blocks:
-            if "lines" in block and len(block["lines"]) > 2:
-                lines = block["lines"]
-                
-                # Check for table-like structure
-                span_counts = [len(line.get("spans", [])) for line in lines]
-                if len(set(span_counts)) <= 2 and max(span_counts) > 1:
-                    # Extract table data
-                    table_data = []
-                    for line in lines:
-                        row_data = []
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
-                            if text:
-                                row_data.append(text)
-                        if row_data:
-                            table_data.append(row_data)
-                    
-                    if table_data:
-                        tables.append({
-                            "page": page_num + 1,
-                            "table_id": f"page_{page_num + 1}_table_{table_id}",
-                            "type": "table",
-                            "rows": len(table_data),
-                            "columns": max(len(row) for row in table_data),
-                            "position": block.get("bbox", {}),
-                            "data": table_data
-                        })
-                        table_id += 1
-        
-        return tables
-    
-    def _analyze_page_structure_fast(self, page: fitz.Page, page_num: int) -> Dict[str, Any]:
+    def _analyze_page_structure_fast(self, rect: fitz.Rect, text_blocks: List[Dict], page_num: int,
+                                     image_count: int) -> Dict[str, Any]:
         """Fast page structure analysis"""
-        rect = page.rect
         
         # Count elements quickly
-        text_blocks = page.get_text("dict").get("blocks", [])
         text_block_count = len([b for b in text_blocks if "lines" in b])
-        image_count = len(page.get_images())
         
-        # Calculate text coverage (simplified)
-        total_text_area = sum((b["bbox"][2] - b["bbox"][0]) * (b["bbox"][3] - b["bbox"][1]) 
-                             for b in text_blocks if "lines" in b and "bbox" in b)
+        # Calculate text coverage (simplified); each bbox is unpacked once
+        total_text_area = sum((x1 - x0) * (y1 - y0)
+                              for x0, y0, x1, y1 in (b["bbox"] for b in text_blocks
+                                                     if "lines" in b and "bbox" in b))
         page_area = rect.width * rect.height
         text_coverage = (total_text_area / page_area) * 100 if page_area > 0 else 0
         
@@ -287,6 +353,51 @@ class PDFProcessor:
             "layout_type": layout_type
         }
 
+def _extract_page_range(args: Tuple[str, int, int]) -> Dict[str, Any]:
+    """Extract content for pages [start, stop) of a PDF in a worker process"""
+    pdf_path, start, stop = args
+    doc = fitz.open(pdf_path)
+    try:
+        return PDFProcessor()._extract_content_optimized(doc, range(start, stop))
+    finally:
+        doc.close()
+
+def _process_one(args: Tuple[str, str, int]) -> Tuple[str, Optional[str]]:
+    """
+    Process one PDF and write its JSON output, in a worker process or inline
+    
+    Args:
+        args: Tuple of (pdf_path, output_dir, page_workers); the worker writes the
+            output itself so large results are never pickled back to the parent.
+            page_workers must be 1 inside the file pool, whose daemonic workers
+            cannot start page workers of their own.
+            
+    Returns:
+        Tuple of (pdf_path, error message or None)
+    """
+    pdf_path, output_dir, page_workers = args
+    filename = os.path.basename(pdf_path)
+    
+    try:
+        logger.info(f"Processing: {filename}")
+        
+        # Process PDF
+        result = PDFProcessor(page_workers=page_workers).process_pdf(pdf_path)
+        
+        # Generate output filename
+        output_filename = f"{os.path.splitext(filename)[0]}.json"
+        output_path = os.path.join(output_dir, output_filename)
+        
+        # Save JSON output
+        with open(output_path, 'wb') as f:
+            f.write(dump_json(result))
+        
+        logger.info(f"Saved: {output_filename}")
+        return pdf_path, None
+        
+    except Exception as e:
+        return pdf_path, str(e)
+
 def process_pdfs():
     """
     Main function to process all PDFs from input directory
@@ -322,7 +433,7 @@ def process_pdfs():
     processor = PDFProcessor()
     
     # Find all PDF files
-    pdf_files = list(input_dir.glob("*.pdf"))
+    pdf_files = find_pdf_files(input_dir)
     
     if not pdf_files:
         logger.warning(f"No PDF files found in {input_dir}")
@@ -330,30 +441,23 @@ def process_pdfs():
     
     logger.info(f"Found {len(pdf_files)} PDF files to process")
     
-    # Process each PDF file
+    # Process PDF files in parallel; each file is independent and CPU-bound
     total_start_time = time.time()
+    max_workers = min(len(pdf_files), os.cpu_count() or 1, 4)
     
-    for pdf_file in pdf_files:
-        try:
-            logger.info(f"Processing: {pdf_file.name}")
-            
-            # Process PDF
-            result = processor.process_pdf(str(pdf_file))
-            
-            # Generate output filename
-            output_filename = f"{pdf_file.stem}.json"
-            output_path = output_dir / output_filename
-            
-            # Save JSON output
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            processor.processed_count += 1
-            logger.info(f"Saved: {output_filename}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
-            processor.error_count += 1
+    # A lone PDF is processed inline, so it can spread its pages over the CPUs instead
+    page_workers = min(os.cpu_count() or 1, 4) if max_workers == 1 else 1
+    tasks = [(pdf_file, str(output_dir), page_workers) for pdf_file in pdf_files]
+    
+    # With a single worker, a spawned interpreter only adds start-up time
+    with spawn_pool(max_workers) if max_workers > 1 else nullcontext() as pool:
+        results = pool.imap_unordered(_process_one, tasks) if pool is not None else map(_process_one, tasks)
+        for pdf_path, error in results:
+            if error is not None:
+                logger.error(f"Failed to process {os.path.basename(pdf_path)}: {error}")
+                processor.error_count += 1
+            else:
+                processor.processed_count += 1
     
     total_time = time.time() - total_start_time
     
@@ -1,8 +1,64 @@
 import os
+import sys
+import json
 import time
-from typing import Union
+from dataclasses import dataclass
+from typing import Any, BinaryIO, List, Literal, Optional, Union, overload
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+# Disk free space changes slowly, so statvfs results are reused for a short window
+_DISK_CACHE_TTL = 10.0
+_DISK_CACHE = {}  # path -> (monotonic time of the statvfs call, free GB)
+
+# Buffer size for files handed back by validate_pdf_file(return_fd=True)
+_READ_BUFFER_SIZE = 1 << 16
+
+# Challenge constraints: ≤ 10 seconds per 50 pages, stay under 80% of 16GB
+_EXPECTED_TIME_PER_PAGE = 10 / 50
+_MEM_LIMIT_MB = 16 * 1024 * 0.8
+
+@dataclass(slots=True)
+class PerfResult:
+    """Result of a performance constraint check; warnings is None when none fired"""
+    time_ok: bool = True
+    mem_ok: bool = True
+    score: int = 100
+    warnings: Optional[List[str]] = None
+
+def dump_json(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize obj as UTF-8 JSON bytes, using orjson when it is installed
+    
+    Non-string dict keys are converted to strings with either encoder, as
+    json.dumps does.
+    
+    Args:
+        obj: Object to serialize
+        indent: Indent by two spaces; compact separators otherwise
+        
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def load_json(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human readable format
@@ -48,45 +104,81 @@ def format_duration(seconds: float) -> str:
         remaining_minutes = int((seconds % 3600) // 60)
         return f"{hours}h {remaining_minutes}m"
 
-def validate_pdf_file(file_path: Union[str, Path]) -> tuple[bool, str]:
+@overload
+def validate_pdf_file(file_path: Union[str, Path], return_fd: Literal[False] = False) -> tuple[bool, str]: ...
+
+@overload
+def validate_pdf_file(file_path: Union[str, Path],
+                      return_fd: Literal[True]) -> tuple[bool, str, Optional[BinaryIO]]: ...
+
+def validate_pdf_file(file_path: Union[str, Path], return_fd: bool = False
+                      ) -> Union[tuple[bool, str], tuple[bool, str, Optional[BinaryIO]]]:
     """
     Validate if a file is a valid PDF
     
     Args:
         file_path: Path to the file
+        return_fd: Also return the open file, positioned at the start, so
+            the caller can parse it without reopening
         
     Returns:
-        Tuple of (is_valid, error_message)
+        Tuple of (is_valid, error_message), or (is_valid, error_message, file)
+        when return_fd is set; file is None unless the PDF is valid
     """
+    is_valid, error_message, f = _check_pdf_file(file_path, return_fd)
+    
+    if return_fd:
+        return is_valid, error_message, f
+    return is_valid, error_message
+
+def _check_pdf_file(file_path: Union[str, Path], keep_open: bool) -> tuple[bool, str, Optional[BinaryIO]]:
+    """Run the PDF checks, returning (is_valid, error_message, file_or_None)"""
+    f = None
     try:
         path = Path(file_path)
         
         # Check if file exists
         if not path.exists():
-            return False, "File does not exist"
+            return False, "File does not exist", None
         
         # Check file extension
         if path.suffix.lower() != '.pdf':
-            return False, "File is not a PDF"
-        
-        # Check if file is readable
-        if not os.access(path, os.R_OK):
-            return False, "File is not readable"
+            return False, "File is not a PDF", None
         
         # Check file size (basic validation)
         if path.stat().st_size == 0:
-            return False, "File is empty"
+            return False, "File is empty", None
+        
+        # Try to read first few bytes to check PDF header; open() reports
+        # unreadable files itself, so no separate permission check is needed.
+        # Only a file handed back to the caller gets the large read buffer.
+        try:
+            if keep_open:
+                f = open(path, 'rb', buffering=_READ_BUFFER_SIZE)
+            else:
+                f = open(path, 'rb', buffering=0)
+        except PermissionError:
+            return False, "File is not readable", None
         
-        # Try to read first few bytes to check PDF header
-        with open(path, 'rb') as f:
+        if keep_open:
+            # peek() fills the buffer without advancing, so a kept file needs no seek
+            header = f.peek(8)[:8]
+        else:
             header = f.read(8)
-            if not header.startswith(b'%PDF-'):
-                return False, "File does not appear to be a valid PDF"
+        if not header.startswith(b'%PDF-'):
+            f.close()
+            return False, "File does not appear to be a valid PDF", None
         
-        return True, ""
+        if not keep_open:
+            f.close()
+            f = None
+        
+        return True, "", f
         
     except Exception as e:
-        return False, f"Error validating file: {str(e)}"
+        if f is not None:
+            f.close()
+        return False, f"Error validating file: {str(e)}", None
 
 def create_temp_directory(base_dir: str = "/tmp") -> Path:
     """
@@ -166,14 +258,11 @@ def get_system_resources() -> dict:
         # Get memory usage
         memory = psutil.virtual_memory()
         
-        # Get disk usage for /tmp
-        disk = psutil.disk_usage('/tmp')
-        
         return {
             "cpu_percent": cpu_percent,
             "memory_percent": memory.percent,
             "memory_available_gb": memory.available / (1024**3),
-            "disk_free_gb": disk.free / (1024**3),
+            "disk_free_gb": _get_disk_free_gb('/tmp'),
             "cpu_count": psutil.cpu_count()
         }
         
@@ -187,6 +276,26 @@ def get_system_resources() -> dict:
             "cpu_count": 8  # As per challenge requirements
         }
 
+def _get_disk_free_gb(path: str) -> float:
+    """
+    Get free disk space, cached for a few seconds to avoid a statvfs per call
+    
+    Args:
+        path: Path on the filesystem to check
+        
+    Returns:
+        Free space in GB
+    """
+    now = time.monotonic()
+    cached = _DISK_CACHE.get(path)
+    if cached is not None and now - cached[0] <= _DISK_CACHE_TTL:
+        return cached[1]
+    
+    stat = os.statvfs(path)
+    free_gb = stat.f_bavail * stat.f_frsize / (1024**3)
+    _DISK_CACHE[path] = (now, free_gb)
+    return free_gb
+
 def log_processing_metrics(filename: str, processing_time: float, page_count: int, 
                           file_size_mb: float, success: bool) -> None:
     """
@@ -212,11 +321,19 @@ def log_processing_metrics(filename: str, processing_time: float, page_count: in
         "mb_per_second": file_size_mb / processing_time if processing_time > 0 else 0
     }
     
-    # In a production environment, this could be logged to a file or monitoring system
-    print(f"METRICS: {metrics}")
+    # In a production environment, this could be logged to a file or monitoring system.
+    # Emit one JSON line so the metrics are machine-parseable.
+    line = dump_json(metrics, indent=False)
+    sys.stdout.flush()  # keep ordering with any pending text output
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is not None:
+        buffer.write(b"METRICS " + line + b"\n")
+    else:
+        # stdout replaced by a text-only stream, e.g. redirect_stdout(StringIO())
+        sys.stdout.write("METRICS " + line.decode("utf-8") + "\n")
 
 def check_performance_constraints(processing_time: float, page_count: int, 
-                                 memory_used_mb: float = 0) -> dict:
+                                 memory_used_mb: float = 0) -> PerfResult:
     """
     Check if processing meets the challenge performance constraints
     
@@ -226,33 +343,29 @@ def check_performance_constraints(processing_time: float, page_count: int,
         memory_used_mb: Memory used in MB
         
     Returns:
-        Dictionary with constraint validation results
+        PerfResult with constraint validation results
     """
-    results = {
-        "time_constraint_met": True,
-        "memory_constraint_met": True,
-        "warnings": [],
-        "performance_score": 100
-    }
+    result = PerfResult()
     
     # Check time constraint: ≤ 10 seconds for 50-page PDF
-    expected_time = (page_count / 50) * 10  # Scale based on page count
+    expected_time = page_count * _EXPECTED_TIME_PER_PAGE  # Scale based on page count
     if processing_time > expected_time:
-        results["time_constraint_met"] = False
-        results["warnings"].append(f"Processing took {processing_time:.2f}s, expected ≤{expected_time:.2f}s")
-        results["performance_score"] -= 30
+        result.time_ok = False
+        result.warnings = [f"Processing took {processing_time:.2f}s, expected ≤{expected_time:.2f}s"]
+        result.score -= 30
     
-    # Check memory constraint: Should stay well under 16GB
-    memory_limit_mb = 16 * 1024  # 16GB in MB
-    if memory_used_mb > memory_limit_mb * 0.8:  # 80% threshold
-        results["memory_constraint_met"] = False
-        results["warnings"].append(f"Memory usage {memory_used_mb:.1f}MB approaching limit")
-        results["performance_score"] -= 20
+    # Check memory constraint: Should stay well under 16GB (80% threshold)
+    if memory_used_mb > _MEM_LIMIT_MB:
+        result.mem_ok = False
+        if result.warnings is None:
+            result.warnings = []
+        result.warnings.append(f"Memory usage {memory_used_mb:.1f}MB approaching limit")
+        result.score -= 20
     
     # Performance scoring
     if processing_time <= expected_time * 0.5:
-        results["performance_score"] += 10  # Bonus for fast processing
+        result.score += 10  # Bonus for fast processing
     
-    results["performance_score"] = max(0, min(100, results["performance_score"]))
+    result.score = max(0, min(100, result.score))
     
-    return results
+    return result